@@ -1,4 +1,6 @@
-from supabase import create_client, Client
+from supabase import create_client, create_async_client, Client, AsyncClient, ClientOptions, AsyncClientOptions
+from typing import Optional
+import httpx
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -10,7 +12,50 @@ supabase_url = os.environ.get('SUPABASE_URL')
 # Use SERVICE_KEY to bypass RLS policies for backend operations
 supabase_key = os.environ.get('SUPABASE_SERVICE_KEY') or os.environ.get('SUPABASE_ANON_KEY')
 
-supabase: Client = create_client(supabase_url, supabase_key)
+# One HTTP/2 pool shared by PostgREST, Storage and Auth. Handlers run the sync client
+# in worker threads, so keep enough warm connections for concurrent webhook bursts.
+SUPABASE_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+SUPABASE_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+supabase: Client = create_client(
+    supabase_url,
+    supabase_key,
+    options=ClientOptions(
+        httpx_client=httpx.Client(http2=True, limits=SUPABASE_LIMITS, timeout=SUPABASE_TIMEOUT, follow_redirects=True)
+    )
+)
 
 def get_supabase() -> Client:
-    return supabase
\ No newline at end of file
+    return supabase
+
+
+# Async client for background jobs already running on the event loop; HTTP/2 multiplexes
+# their writes over a few kept-alive connections
+SUPABASE_ASYNC_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=8)
+
+_supabase_async: Optional[AsyncClient] = None
+_supabase_async_http: Optional[httpx.AsyncClient] = None
+
+
+async def get_supabase_async() -> AsyncClient:
+    """Async Supabase client, built on first use (creating it must be awaited inside the loop)"""
+    global _supabase_async, _supabase_async_http
+    if _supabase_async is None:
+        _supabase_async_http = httpx.AsyncClient(
+            http2=True, limits=SUPABASE_ASYNC_LIMITS, timeout=SUPABASE_TIMEOUT, follow_redirects=True
+        )
+        _supabase_async = await create_async_client(
+            supabase_url,
+            supabase_key,
+            options=AsyncClientOptions(httpx_client=_supabase_async_http)
+        )
+    return _supabase_async
+
+
+async def close_supabase_async():
+    """Close the async client's pool (called from the app lifespan on shutdown)"""
+    global _supabase_async, _supabase_async_http
+    if _supabase_async_http is not None:
+        await _supabase_async_http.aclose()
+    _supabase_async = None
+    _supabase_async_http = None
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.rest import Client as TwilioClient
+
+logger = logging.getLogger(__name__)
+
+# Transient failures worth retrying; 4xx responses are returned to the caller as-is
+RETRY_EXCEPTIONS = (httpx.TransportError,)
+
+
+async def with_retry(request_fn: Callable[[], Awaitable[httpx.Response]], attempts: int = 3) -> httpx.Response:
+    """
+    Run an httpx request, retrying transport errors and 5xx responses with 1s, 2s, ... backoff.
+    The final response (or exception) is passed through unchanged.
+    """
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        try:
+            response = await request_fn()
+        except RETRY_EXCEPTIONS as e:
+            if last_attempt:
+                raise
+            logger.warning("⚠️ Request attempt %d failed: %r, retrying", attempt + 1, e)
+        else:
+            if response.status_code < 500 or last_attempt:
+                return response
+            logger.warning("⚠️ Request attempt %d got HTTP %d, retrying", attempt + 1, response.status_code)
+        await asyncio.sleep(2 ** attempt)
+
+
+# ==============================================================================
+# SHARED CONNECTION POOLS
+# ==============================================================================
+# Twilio media GETs (small, redirected to the CDN) and Supabase storage POSTs
+# (large bodies) get separate pools so downloads never queue behind uploads.
+
+TWILIO_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=10)
+TWILIO_TIMEOUT = httpx.Timeout(30.0, connect=3.0)
+SUPABASE_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+SUPABASE_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+_twilio_http: Optional[httpx.AsyncClient] = None
+_supabase_http: Optional[httpx.AsyncClient] = None
+_default_http: Optional[httpx.AsyncClient] = None
+_twilio_rest: Optional[TwilioClient] = None
+
+
+def get_twilio_http() -> httpx.AsyncClient:
+    """Pool for Twilio media downloads, pre-authenticated with the account credentials"""
+    global _twilio_http
+    if _twilio_http is None or _twilio_http.is_closed:
+        _twilio_http = httpx.AsyncClient(
+            auth=(os.environ.get('TWILIO_ACCOUNT_SID'), os.environ.get('TWILIO_AUTH_TOKEN')),
+            follow_redirects=True,
+            limits=TWILIO_LIMITS,
+            timeout=TWILIO_TIMEOUT
+        )
+    return _twilio_http
+
+
+def get_supabase_http() -> httpx.AsyncClient:
+    """HTTP/2 pool for Supabase Storage, carrying the service-key Authorization header"""
+    global _supabase_http
+    if _supabase_http is None or _supabase_http.is_closed:
+        _supabase_http = httpx.AsyncClient(
+            base_url=os.environ.get('SUPABASE_URL') or '',
+            headers={'Authorization': f"Bearer {os.environ.get('SUPABASE_SERVICE_KEY')}"},
+            http2=True,  # upload + sign share one multiplexed connection
+            limits=SUPABASE_LIMITS,
+            timeout=SUPABASE_TIMEOUT
+        )
+    return _supabase_http
+
+
+def get_default_http() -> httpx.AsyncClient:
+    """Unauthenticated pool for other fetches, so no credentials leak to third-party hosts"""
+    global _default_http
+    if _default_http is None or _default_http.is_closed:
+        _default_http = httpx.AsyncClient(follow_redirects=True, timeout=DEFAULT_TIMEOUT)
+    return _default_http
+
+
+def get_twilio_rest() -> TwilioClient:
+    """
+    Twilio REST client on the SDK's aiohttp transport, for `create_async` calls.
+    Built on first use because its aiohttp session must be created inside the running loop.
+    No transport retries: a POST that reached Twilio may already have sent the message.
+    """
+    global _twilio_rest
+    if _twilio_rest is None:
+        _twilio_rest = TwilioClient(
+            os.environ.get('TWILIO_ACCOUNT_SID'),
+            os.environ.get('TWILIO_AUTH_TOKEN'),
+            http_client=AsyncTwilioHttpClient(timeout=30)
+        )
+    return _twilio_rest
+
+
+async def close_http_clients():
+    """Close the shared pools (called from the app lifespan on shutdown)"""
+    global _twilio_http, _supabase_http, _default_http, _twilio_rest
+    for client in (_twilio_http, _supabase_http, _default_http):
+        if client is not None:
+            await client.aclose()
+    if _twilio_rest is not None:
+        await _twilio_rest.http_client.close()
+    _twilio_http = None
+    _supabase_http = None
+    _default_http = None
+    _twilio_rest = None
@@ -7,15 +7,22 @@ from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from auth import get_current_user, TokenData
-from emergentintegrations.llm.chat import LlmChat, UserMessage, FileContent
+from emergentintegrations.llm.chat import LlmChat, UserMessage, ImageContent
 from emergentintegrations.llm.openai import OpenAISpeechToText
 import os
-import uuid
+from secrets import token_hex
+import io
 import json
+import orjson
+import re
 import base64
-import subprocess
+import asyncio
+import hashlib
+import logging
+from cachetools import LRUCache, TTLCache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
 
@@ -91,7 +98,7 @@ LANGUAGE_SCRIPTS = {
 }
 
 # Hinglish keywords (Roman Hindi)
-HINGLISH_KEYWORDS = [
+HINGLISH_KEYWORDS = frozenset([
     'mera', 'meri', 'mujhe', 'kya', 'hai', 'hain', 'nahi', 'nhi', 'kaise', 'kahan',
     'aap', 'tum', 'aapka', 'kripya', 'namaste', 'dhanyawad', 'shukriya', 'madad',
     'paani', 'pani', 'bijli', 'sadak', 'hospital', 'pension', 'ration', 'yojana',
@@ -99,7 +106,133 @@ HINGLISH_KEYWORDS = [
     'batao', 'bataye', 'bataiye', 'lagao', 'milega', 'milegi', 'dedo', 'dijiye',
     'abhi', 'aur', 'bhi', 'lekin', 'par', 'phir', 'woh', 'yeh', 'ye', 'iska',
     'iski', 'uska', 'uski', 'humara', 'tumhara', 'unka', 'inhe', 'unhe', 'jaldi'
-]
+])
+
+# Display names for codes returned by detect_language()
+DETECTED_LANGUAGE_NAMES = {
+    'te': 'Telugu', 'hi': 'Hindi', 'ta': 'Tamil',
+    'kn': 'Kannada', 'ml': 'Malayalam', 'bn': 'Bengali',
+    'en': 'English'
+}
+
+# Strict language code mapping for translation and OCR output
+SUPPORTED_LANGUAGES = {
+    'en': 'English',
+    'hi': 'Hindi', 
+    'hinglish': 'Hindi (Hinglish - Roman script)',
+    'te': 'Telugu',
+    'tenglish': 'Telugu (Tenglish - Roman script)',
+    'ta': 'Tamil',
+    'kn': 'Kannada', 
+    'ml': 'Malayalam', 
+    'bn': 'Bengali',
+    'mr': 'Marathi',
+    'gu': 'Gujarati',
+    'pa': 'Punjabi'
+}
+
+# If a translation contains any of these, the model drifted into a European language
+TRANSLATION_FOREIGN_MARKERS = (
+    'je suis', 'nous', 'vous', 'gracias', 'merci', 'bonjour', 'hola', 
+    'danke', 'bitte', 'constatat', 'nemulțumirea', 'înregistrat', 'dumneavoastră'
+)
+
+# Shared JSON schema for vision extraction; {extra_fields} lets callers add keys
+VISION_SCHEMA = """
+
+Return ONLY valid JSON (no markdown, no backticks):
+{{"name": "string or null", "contact": "string or null", "area": "string or null", "category": "string", "description": "string in ENGLISH",{extra_fields} "language": "en/hi/hinglish/te/ta/kn/ml/bn"}}"""
+
+OCR_PROMPT = """Perform DEEP OCR on this document/image.
+
+EXTRACT and OUTPUT IN ENGLISH:
+1. Name (transliterate to English)
+2. Contact Number (10 digits)
+3. Area/Location (transliterate to English)
+4. Issue Category (from official list - in English)
+5. Issue Description (in ENGLISH - translate if needed)
+6. Original Language Code (en/hi/hinglish/te/ta/kn/ml/bn)""" + VISION_SCHEMA.format_map({'extra_fields': ''})
+
+IMAGE_ANALYSIS_PROMPT = "Analyze this image and extract grievance information in ENGLISH." + VISION_SCHEMA.format_map(
+    {'extra_fields': ' "urgency": "CRITICAL/HIGH/MEDIUM/LOW",'}
+)
+
+OCR_SYSTEM_MESSAGE = """You are an expert OCR system for Indian government grievance documents.
+
+TASK: Deep OCR with ENGLISH output.
+
+CRITICAL RULES:
+1. Documents may contain Hindi, Telugu, Tamil, English or mixed languages
+2. Extract ALL entities regardless of script
+3. ALL OUTPUT MUST BE IN ENGLISH - translate/transliterate everything
+
+ENTITY EXTRACTION:
+- NAME: Transliterate to English (राम कुमार → Ram Kumar)
+- AREA: Transliterate to English (वारंगल → Warangal)
+- CONTACT: Extract 10-digit phone numbers
+- CATEGORY: Use official English categories ONLY
+- DESCRIPTION: Summarize issue in clear ENGLISH
+
+OFFICIAL CATEGORIES (pick EXACTLY one):
+Water & Irrigation, Agriculture, Health & Sanitation, Education, 
+Infrastructure & Roads, Law & Order, Welfare Schemes, Electricity,
+Forests & Environment, Finance & Taxation, Urban & Rural Development, Miscellaneous
+
+LANGUAGE CODE: Return the ORIGINAL language code of the document:
+- 'en' for English
+- 'hi' for Hindi
+- 'hinglish' for Hindi in Roman script
+- 'te' for Telugu
+- 'ta' for Tamil
+- 'kn' for Kannada
+- 'ml' for Malayalam
+- 'bn' for Bengali"""
+
+IMAGE_ANALYSIS_SYSTEM_MESSAGE = """You are an expert document analyzer for Indian government grievance systems.
+
+TASK: Extract grievance information in ENGLISH.
+
+RULES:
+1. Transliterate all names/places to English
+2. Use official English categories
+3. Describe issues in clear English
+4. Return valid language codes only: en/hi/hinglish/te/ta/kn/ml/bn
+
+OFFICIAL CATEGORIES:
+Water & Irrigation, Agriculture, Forests & Environment, Health & Sanitation, 
+Education, Infrastructure & Roads, Law & Order, Welfare Schemes, 
+Finance & Taxation, Urban & Rural Development, Electricity, Miscellaneous"""
+
+# Image MIME types passed through to the OCR step; anything else is treated as JPEG
+IMAGE_CONTENT_TYPES = {
+    'image/png': 'image/png', 'image/x-png': 'image/png',
+    'image/gif': 'image/gif',
+    'image/webp': 'image/webp',
+}
+
+
+def json_object_text(text: str) -> str:
+    """
+    Slice the JSON object out of an LLM reply in one bounded scan: everything between the
+    first '{' and the last '}', so ``` fences and stray prose around it are ignored.
+    With no object in the reply the text is returned as-is for the parser to reject.
+    """
+    start = text.find('{')
+    end = text.rfind('}')
+    if start == -1 or end < start:
+        return text
+    return text[start:end + 1]
+
+
+def extract_json(text: str) -> Any:
+    """Parse the JSON object in an LLM reply (orjson.JSONDecodeError subclasses json.JSONDecodeError)"""
+    return orjson.loads(json_object_text(text))
+
+
+def _b64_encode(data: bytes) -> str:
+    """Base64-encode media bytes (run in a worker thread for large images)"""
+    return base64.b64encode(data).decode('ascii')
+
 
 def detect_language(text: str) -> str:
     """
@@ -144,10 +277,61 @@ def detect_language(text: str) -> str:
 # THE "OSD BRAIN" - INTENT CLASSIFICATION
 # ==============================================================================
 
-async def analyze_incoming_message(text: str, sender_name: str = "Citizen", sender_phone: str = "") -> Dict[str, Any]:
+# Verbatim repeats ("ok", "thank you", "when will it be fixed") skip the LLM round-trip.
+# Long or numeric messages (ratings, ticket numbers, addresses) are near-unique: never cached.
+INTENT_CACHE_TTL_SECONDS = 3600
+INTENT_CACHE_MAX_CHARS = 200
+INTENT_CACHE = TTLCache(maxsize=4096, ttl=INTENT_CACHE_TTL_SECONDS)
+DIGIT_RE = re.compile(r'\d')
+
+class IntentReply(BaseModel):
+    """OSD Brain decision, decoded straight from the LLM's JSON; omitted fields get safe defaults"""
+    intent: str = "CHAT"
+    detected_language: Optional[str] = None
+    reply: Optional[str] = None
+    grievance_data: Optional[Dict[str, Any]] = None
+
+
+OSD_FALLBACK_REPLIES = {
+    'en': "Hello. I am here to help you. How may I assist you today?",
+    'other': "Namaste. Main aapki seva mein hoon. Kaise madad kar sakta hoon?",
+}
+
+
+async def analyze_incoming_message(text: str, sender_name: str = "Citizen", sender_phone: str = "") -> IntentReply:
+    """Classify a message, reusing the decision for a recently seen identical message"""
+    key = None
+    if len(text) <= INTENT_CACHE_MAX_CHARS and not DIGIT_RE.search(text):
+        # The greeting reply carries the sender's name, so it is part of the key
+        key = (' '.join(text.split()).casefold(), sender_name)
+        decision = INTENT_CACHE.get(key)
+        if decision is not None:
+            return decision.model_copy(deep=True)
+    
+    try:
+        decision = await analyze_incoming_message_uncached(text, sender_name, sender_phone)
+    except Exception as e:
+        # LLM failed; the apology is never cached, so the next delivery retries the LLM
+        logger.error("❌ OSD Brain Error: %s", e)
+        detected_lang = detect_language(text)
+        return IntentReply(
+            intent="CHAT",
+            detected_language=detected_lang,
+            reply=OSD_FALLBACK_REPLIES['en' if detected_lang == 'en' else 'other'],
+            grievance_data=None
+        )
+    
+    if key is None:
+        return decision
+    INTENT_CACHE[key] = decision
+    return decision.model_copy(deep=True)
+
+
+async def analyze_incoming_message_uncached(text: str, sender_name: str = "Citizen", sender_phone: str = "") -> IntentReply:
     """
     The Core Intelligence - OSD Persona with "Holistic Knowledge" System.
     CTO MANDATE: AI uses internal knowledge for ANY state/national scheme links.
+    LLM and parsing errors propagate; analyze_incoming_message turns them into the fallback reply.
     """
     
     # First detect language (frugal, no LLM)
@@ -219,14 +403,13 @@ Provide helpful information with official links.
     "grievance_data": {{"name": null, "area": null, "category": "English", "description": "English summary"}}
 }}"""
 
-    try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"osd-brain-{uuid.uuid4()}",
-            system_message=system_prompt
-        ).with_model("openai", "gpt-4o-mini")  # Smart enough for URLs, cheap for scale
-        
-        prompt = f"""Analyze this message from an Indian citizen:
+    chat = LlmChat(
+        api_key=EMERGENT_LLM_KEY,
+        session_id=f"osd-brain-{token_hex(8)}",
+        system_message=system_prompt
+    ).with_model("openai", "gpt-4o-mini")  # Smart enough for URLs, cheap for scale
+    
+    prompt = f"""Analyze this message from an Indian citizen:
 
 MESSAGE: "{text}"
 DETECTED LANGUAGE: {detected_lang}
@@ -242,42 +425,27 @@ STRICT INSTRUCTIONS:
 GREETING TEMPLATE (translate to {detected_lang}):
 "Namaste, {sender_name}. Thank you for reaching out to the Office of the Leader. We truly appreciate you taking the time to connect with us. We are here to support you. You may share your query or register a grievance, and our team will carefully look into the matter and assist you as soon as possible.\""""
 
-        result = await chat.send_message(UserMessage(text=prompt))
-        clean_result = result.replace('```json', '').replace('```', '').strip()
-        parsed = json.loads(clean_result)
-        
-        # JUGAAD SAFETY NET - Catch foreign language hallucinations
-        reply = parsed.get('reply', '')
-        foreign_triggers = [' je ', ' suis ', ' nous ', ' vous ', ' gracias ', ' merci ', ' bonjour ', 
-                          ' j\'ai ', ' votre ', ' réclamation ', ' hola ', ' danke ', ' bitte ']
-        
-        if any(trigger in f" {reply.lower()} " for trigger in foreign_triggers):
-            print("⚠️ IRON DOME: Foreign language detected. Fallback triggered.")
-            text_lower = text.lower()
-            if any(w in text_lower for w in ['hospital', 'doctor', 'ilaaz', 'bimar', 'medical', 'aarogyasri']):
-                parsed['reply'] = "Namaste. Medical help ke liye 108 call karein. Aarogyasri: https://aarogyasri.telangana.gov.in/"
-            elif any(w in text_lower for w in ['pension', 'ration', 'scheme', 'yojana']):
-                parsed['reply'] = "Namaste. Scheme ke liye Meeseva: https://ts.meeseva.telangana.gov.in/"
-            else:
-                parsed['reply'] = "Namaste. Kripya apni samasya detail mein batayein. Hum madad karenge."
-        
-        parsed['detected_language'] = parsed.get('detected_language', detected_lang)
-        return parsed
-        
-    except Exception as e:
-        print(f"❌ OSD Brain Error: {e}")
-        # Return response in detected language
-        if detected_lang == 'en':
-            fallback_reply = "Hello. I am here to help you. How may I assist you today?"
+    result = await chat.send_message(UserMessage(text=prompt))
+    decision = IntentReply.model_validate_json(json_object_text(result))
+    
+    # JUGAAD SAFETY NET - Catch foreign language hallucinations
+    reply = decision.reply or ''
+    foreign_triggers = [' je ', ' suis ', ' nous ', ' vous ', ' gracias ', ' merci ', ' bonjour ', 
+                      ' j\'ai ', ' votre ', ' réclamation ', ' hola ', ' danke ', ' bitte ']
+    
+    if any(trigger in f" {reply.lower()} " for trigger in foreign_triggers):
+        logger.warning("⚠️ IRON DOME: Foreign language detected. Fallback triggered.")
+        text_lower = text.lower()
+        if any(w in text_lower for w in ['hospital', 'doctor', 'ilaaz', 'bimar', 'medical', 'aarogyasri']):
+            decision.reply = "Namaste. Medical help ke liye 108 call karein. Aarogyasri: https://aarogyasri.telangana.gov.in/"
+        elif any(w in text_lower for w in ['pension', 'ration', 'scheme', 'yojana']):
+            decision.reply = "Namaste. Scheme ke liye Meeseva: https://ts.meeseva.telangana.gov.in/"
         else:
-            fallback_reply = "Namaste. Main aapki seva mein hoon. Kaise madad kar sakta hoon?"
-        
-        return {
-            "intent": "CHAT",
-            "detected_language": detected_lang,
-            "reply": fallback_reply,
-            "grievance_data": None
-        }
+            decision.reply = "Namaste. Kripya apni samasya detail mein batayein. Hum madad karenge."
+    
+    if decision.detected_language is None:
+        decision.detected_language = detected_lang
+    return decision
 
 
 # ==============================================================================
@@ -291,25 +459,9 @@ async def translate_text(text: str, target_lang: str) -> str:
     Translate text to target language with STRICT fallback to English.
     Only translates to KNOWN Indian languages - never random languages.
     """
-    # Strict language code mapping
-    SUPPORTED_LANGUAGES = {
-        'en': 'English',
-        'hi': 'Hindi', 
-        'hinglish': 'Hindi (Hinglish - Roman script)',
-        'te': 'Telugu',
-        'tenglish': 'Telugu (Tenglish - Roman script)',
-        'ta': 'Tamil',
-        'kn': 'Kannada', 
-        'ml': 'Malayalam', 
-        'bn': 'Bengali',
-        'mr': 'Marathi',
-        'gu': 'Gujarati',
-        'pa': 'Punjabi'
-    }
-    
     # If language is English or not in supported list, return original English
     if target_lang == 'en' or target_lang not in SUPPORTED_LANGUAGES:
-        print(f"📝 [Translation] Keeping English (target was: {target_lang})")
+        logger.debug("📝 [Translation] Keeping English (target was: %s)", target_lang)
         return text
     
     target_name = SUPPORTED_LANGUAGES[target_lang]
@@ -317,7 +469,7 @@ async def translate_text(text: str, target_lang: str) -> str:
     try:
         chat = LlmChat(
             api_key=EMERGENT_LLM_KEY,
-            session_id=f"translate-{uuid.uuid4()}",
+            session_id=f"translate-{token_hex(8)}",
             system_message=f"""You are a professional translator specializing in Indian languages.
             
 STRICT RULES:
@@ -331,20 +483,18 @@ STRICT RULES:
         result = await chat.send_message(UserMessage(text=f"Translate this to {target_name}: {text}"))
         
         # Safety check - if response contains foreign language markers, return English
-        foreign_markers = ['je suis', 'nous', 'vous', 'gracias', 'merci', 'bonjour', 'hola', 
-                         'danke', 'bitte', 'constatat', 'nemulțumirea', 'înregistrat', 'dumneavoastră']
         response_lower = result.lower()
         
-        for marker in foreign_markers:
+        for marker in TRANSLATION_FOREIGN_MARKERS:
             if marker in response_lower:
-                print(f"⚠️ [Translation] Foreign language detected in response! Returning English.")
+                logger.warning("⚠️ [Translation] Foreign language detected in response! Returning English.")
                 return text
         
-        print(f"✅ [Translation] Translated to {target_name}")
+        logger.debug("✅ [Translation] Translated to %s", target_name)
         return result.strip()
         
     except Exception as e:
-        print(f"⚠️ [Translation] Failed: {e}. Returning English.")
+        logger.warning("⚠️ [Translation] Failed: %s. Returning English.", e)
         return text
 
 
@@ -362,13 +512,15 @@ async def extract_grievance_from_media(media_data: bytes, media_type: str) -> Di
     
     ALL OUTPUT IS IN ENGLISH for database storage.
     """
+    result = None
     try:
-        # Determine content type
-        is_pdf = 'pdf' in media_type.lower()
+        # Determine content type (MIME essence, lower-cased once)
+        mime_type = media_type.partition(';')[0].strip().lower()
+        is_pdf = 'pdf' in mime_type
         
         if is_pdf:
             # Convert PDF first page to image
-            print(f"📄 [GOLD STANDARD OCR] PDF detected, converting first page to image...")
+            logger.debug("📄 [GOLD STANDARD OCR] PDF detected, converting first page to image...")
             try:
                 import fitz  # PyMuPDF
                 pdf_doc = fitz.open(stream=media_data, filetype="pdf")
@@ -377,13 +529,13 @@ async def extract_grievance_from_media(media_data: bytes, media_type: str) -> Di
                 image_data = pix.tobytes("png")
                 content_type = "image/png"
                 pdf_doc.close()
-                print(f"✅ [GOLD STANDARD OCR] PDF converted to PNG: {len(image_data)} bytes")
+                logger.debug("✅ [GOLD STANDARD OCR] PDF converted to PNG: %d bytes", len(image_data))
             except ImportError:
-                print(f"⚠️ [GOLD STANDARD OCR] PyMuPDF not installed, trying direct processing...")
+                logger.warning("⚠️ [GOLD STANDARD OCR] PyMuPDF not installed, trying direct processing...")
                 image_data = media_data
                 content_type = "application/pdf"
             except Exception as pdf_error:
-                print(f"⚠️ [GOLD STANDARD OCR] PDF conversion failed: {pdf_error}")
+                logger.warning("⚠️ [GOLD STANDARD OCR] PDF conversion failed: %s", pdf_error)
                 # Return a helpful error message
                 return {
                     "name": None,
@@ -395,115 +547,53 @@ async def extract_grievance_from_media(media_data: bytes, media_type: str) -> Di
                 }
         else:
             image_data = media_data
-            if 'png' in media_type.lower():
-                content_type = "image/png"
-            elif 'gif' in media_type.lower():
-                content_type = "image/gif"
-            elif 'webp' in media_type.lower():
-                content_type = "image/webp"
-            else:
-                content_type = "image/jpeg"
+            content_type = IMAGE_CONTENT_TYPES.get(mime_type, "image/jpeg")
         
-        media_base64 = base64.b64encode(image_data).decode('utf-8')
+        media_base64 = await asyncio.to_thread(_b64_encode, image_data)
         
-        print(f"📎 [GOLD STANDARD OCR] Processing: type={content_type}, size={len(image_data)} bytes")
+        logger.debug("📎 [GOLD STANDARD OCR] Processing: type=%s, size=%d bytes", content_type, len(image_data))
         
         # Use ImageContent for proper image handling with emergentintegrations
-        from emergentintegrations.llm.chat import ImageContent
-        
         image_content = ImageContent(image_base64=media_base64)
         
         # Use Gemini Vision
         chat = LlmChat(
             api_key=EMERGENT_LLM_KEY,
-            session_id=f"gold-ocr-{uuid.uuid4()}",
-            system_message="""You are an expert OCR system for Indian government grievance documents.
-
-TASK: Deep OCR with ENGLISH output.
-
-CRITICAL RULES:
-1. Documents may contain Hindi, Telugu, Tamil, English or mixed languages
-2. Extract ALL entities regardless of script
-3. ALL OUTPUT MUST BE IN ENGLISH - translate/transliterate everything
-
-ENTITY EXTRACTION:
-- NAME: Transliterate to English (राम कुमार → Ram Kumar)
-- AREA: Transliterate to English (वारंगल → Warangal)
-- CONTACT: Extract 10-digit phone numbers
-- CATEGORY: Use official English categories ONLY
-- DESCRIPTION: Summarize issue in clear ENGLISH
-
-OFFICIAL CATEGORIES (pick EXACTLY one):
-Water & Irrigation, Agriculture, Health & Sanitation, Education, 
-Infrastructure & Roads, Law & Order, Welfare Schemes, Electricity,
-Forests & Environment, Finance & Taxation, Urban & Rural Development, Miscellaneous
-
-LANGUAGE CODE: Return the ORIGINAL language code of the document:
-- 'en' for English
-- 'hi' for Hindi
-- 'hinglish' for Hindi in Roman script
-- 'te' for Telugu
-- 'ta' for Tamil
-- 'kn' for Kannada
-- 'ml' for Malayalam
-- 'bn' for Bengali"""
+            session_id=f"gold-ocr-{token_hex(8)}",
+            system_message=OCR_SYSTEM_MESSAGE
         ).with_model("gemini", "gemini-2.0-flash")
         
-        ocr_prompt = """Perform DEEP OCR on this document/image.
-
-EXTRACT and OUTPUT IN ENGLISH:
-1. Name (transliterate to English)
-2. Contact Number (10 digits)
-3. Area/Location (transliterate to English)
-4. Issue Category (from official list - in English)
-5. Issue Description (in ENGLISH - translate if needed)
-6. Original Language Code (en/hi/hinglish/te/ta/kn/ml/bn)
-
-Return ONLY valid JSON (no markdown, no backticks):
-{"name": "string or null", "contact": "string or null", "area": "string or null", "category": "string", "description": "string in ENGLISH", "language": "en/hi/hinglish/te/ta/kn/ml/bn"}"""
-        
-        msg = UserMessage(text=ocr_prompt, file_contents=[image_content])
+        msg = UserMessage(text=OCR_PROMPT, file_contents=[image_content])
         result = await chat.send_message(msg)
         
-        print(f"📝 [GOLD STANDARD OCR] Raw response: {result[:200]}...")
-        
-        # Clean and parse response
-        clean_result = result.strip()
-        if clean_result.startswith('```'):
-            clean_result = clean_result.split('```')[1]
-            if clean_result.startswith('json'):
-                clean_result = clean_result[4:]
-        clean_result = clean_result.replace('```', '').strip()
+        logger.debug("📝 [GOLD STANDARD OCR] Raw response: %.200s...", result)
         
-        extracted = json.loads(clean_result)
+        extracted = extract_json(result)
         
         # Ensure category is from official list
         if extracted.get('category') not in OFFICIAL_CATEGORIES:
             extracted['category'] = map_to_official_category(extracted.get('category', ''))
         
         # Normalize language code
-        valid_langs = ['en', 'hi', 'hinglish', 'te', 'tenglish', 'ta', 'kn', 'ml', 'bn', 'mr', 'gu', 'pa']
-        if extracted.get('language') not in valid_langs:
+        if extracted.get('language') not in SUPPORTED_LANGUAGES:
             extracted['language'] = 'en'  # Default to English for unknown
         
-        print(f"✅ [GOLD STANDARD OCR] Success: {extracted.get('description', '')[:100]}...")
+        logger.debug("✅ [GOLD STANDARD OCR] Success: %.100s...", extracted.get('description', ''))
         return extracted
         
     except json.JSONDecodeError as je:
-        print(f"❌ [GOLD STANDARD OCR] JSON parse error: {je}")
-        print(f"Raw response was: {result[:500] if 'result' in dir() else 'No result'}")
+        logger.error("❌ [GOLD STANDARD OCR] JSON parse error: %s", je)
+        logger.debug("Raw response was: %.500s", result if result is not None else 'No result')
         return {
             "name": None,
             "contact": None,
             "area": None,
             "category": "Miscellaneous",
-            "description": result[:500] if 'result' in dir() else "Could not process document",
+            "description": result[:500] if result is not None else "Could not process document",
             "language": "en"
         }
     except Exception as e:
-        print(f"❌ [GOLD STANDARD OCR] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ [GOLD STANDARD OCR] Error: %s", e)
         return None
 
 
@@ -511,70 +601,87 @@ Return ONLY valid JSON (no markdown, no backticks):
 # AUDIO TRANSCRIPTION
 # ==============================================================================
 
+# Forwarded voice notes arrive byte-identical; key on a digest so the cache never holds the audio
+TRANSCRIPT_CACHE = LRUCache(maxsize=1024)
+
+# In-flight Whisper requests across all senders, to stay inside the API rate limit
+WHISPER_CONCURRENCY = 8
+_whisper_semaphore = asyncio.Semaphore(WHISPER_CONCURRENCY)
+
+# (content-type marker, file extension) in precedence order; WhatsApp voice notes default to OGG
+AUDIO_EXTENSIONS = (('mp3', 'mp3'), ('mpeg', 'mp3'), ('wav', 'wav'), ('amr', 'amr'), ('opus', 'opus'))
+
+
 async def transcribe_audio(audio_binary: bytes, content_type: str = "audio/ogg") -> str:
+    """Transcribe audio, reusing the transcript of an identical recording heard before"""
+    if not audio_binary:
+        return await transcribe_audio_uncached(audio_binary, content_type)
+    
+    key = hashlib.blake2b(audio_binary, digest_size=16).digest()
+    transcript = TRANSCRIPT_CACHE.get(key)
+    if transcript is None:
+        transcript = await transcribe_audio_uncached(audio_binary, content_type)
+        if transcript:
+            TRANSCRIPT_CACHE[key] = transcript
+    return transcript
+
+
+async def convert_to_mp3(audio_binary: bytes) -> Optional[bytes]:
+    """Re-encode a voice note as 16 kHz mono MP3, piping through ffmpeg without temp files"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-i', 'pipe:0', '-acodec', 'libmp3lame', '-ar', '16000', '-ac', '1', '-b:a', '64k', '-f', 'mp3', 'pipe:1',
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except Exception as e:
+        logger.warning("⚠️ FFmpeg error: %s", e)
+        return None
+    
+    try:
+        mp3_data, stderr = await asyncio.wait_for(process.communicate(audio_binary), timeout=60)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.warning("⚠️ FFmpeg conversion timed out")
+        return None
+    
+    if process.returncode == 0 and len(mp3_data) > 100:
+        return mp3_data
+    logger.warning("⚠️ FFmpeg conversion failed or output too small. stderr: %s", stderr[:200].decode(errors='replace') if stderr else 'none')
+    return None
+
+
+async def transcribe_audio_uncached(audio_binary: bytes, content_type: str = "audio/ogg") -> str:
     """
     Transcribe audio using Whisper via Emergent wrapper.
     Handles OGG/OPUS to MP3 conversion for WhatsApp voice notes.
     """
     try:
         if not audio_binary or len(audio_binary) < 100:
-            print(f"❌ Audio data too small or empty: {len(audio_binary) if audio_binary else 0} bytes")
+            logger.warning("❌ Audio data too small or empty: %d bytes", len(audio_binary) if audio_binary else 0)
             return ""
         
-        temp_id = str(uuid.uuid4())
-        
         # Determine original format
-        original_ext = 'ogg'
-        if 'mp3' in content_type or 'mpeg' in content_type:
-            original_ext = 'mp3'
-        elif 'wav' in content_type:
-            original_ext = 'wav'
-        elif 'amr' in content_type:
-            original_ext = 'amr'
-        elif 'opus' in content_type:
-            original_ext = 'opus'
-        
-        original_path = f"/tmp/audio_{temp_id}.{original_ext}"
-        
-        # Save audio to temp file
-        with open(original_path, 'wb') as f:
-            f.write(audio_binary)
-        
-        file_size = os.path.getsize(original_path)
-        print(f"🎤 Audio saved: {original_path}, size: {file_size} bytes, type: {content_type}")
-        
-        if file_size < 100:
-            print(f"❌ Audio file too small after save: {file_size} bytes")
-            os.remove(original_path)
-            return ""
+        original_ext = next((ext for marker, ext in AUDIO_EXTENSIONS if marker in content_type), 'ogg')
+        
+        logger.debug("🎤 Audio received: %d bytes, type: %s", len(audio_binary), content_type)
         
         # Convert to MP3 if needed (Whisper doesn't support OGG/OPUS well)
-        transcribe_path = original_path
+        transcribe_data, transcribe_ext = audio_binary, original_ext
         if original_ext in ['ogg', 'opus', 'amr']:
-            mp3_path = f"/tmp/audio_{temp_id}.mp3"
-            try:
-                print(f"🔄 Converting {original_ext} to MP3...")
-                result = subprocess.run(
-                    ['ffmpeg', '-i', original_path, '-acodec', 'libmp3lame', '-ar', '16000', '-ac', '1', '-b:a', '64k', '-y', mp3_path],
-                    capture_output=True, text=True, timeout=60
-                )
-                
-                if result.returncode == 0 and os.path.exists(mp3_path) and os.path.getsize(mp3_path) > 100:
-                    transcribe_path = mp3_path
-                    print(f"✅ Converted to MP3: {mp3_path}, size: {os.path.getsize(mp3_path)} bytes")
-                else:
-                    print(f"⚠️ FFmpeg conversion failed or output too small. stderr: {result.stderr[:200] if result.stderr else 'none'}")
-                    # Try with original file anyway
-            except subprocess.TimeoutExpired:
-                print("⚠️ FFmpeg conversion timed out")
-            except Exception as conv_error:
-                print(f"⚠️ FFmpeg error: {conv_error}")
-        
-        # Transcribe using Emergent Wrapper
-        print(f"🎯 Transcribing: {transcribe_path}")
-        transcriber = OpenAISpeechToText(api_key=EMERGENT_LLM_KEY)
+            logger.debug("🔄 Converting %s to MP3...", original_ext)
+            mp3_data = await convert_to_mp3(audio_binary)
+            if mp3_data:
+                transcribe_data, transcribe_ext = mp3_data, 'mp3'
+                logger.debug("✅ Converted to MP3: %d bytes", len(mp3_data))
+            # else: try with the original audio anyway
         
-        with open(transcribe_path, 'rb') as audio_file:
+        # Transcribe using Emergent Wrapper, straight from memory
+        audio_file = io.BytesIO(transcribe_data)
+        audio_file.name = f"voice.{transcribe_ext}"  # Whisper infers the format from the file name
+        logger.debug("🎯 Transcribing: %s", audio_file.name)
+        transcriber = OpenAISpeechToText(api_key=EMERGENT_LLM_KEY)
+        async with _whisper_semaphore:
             response = await transcriber.transcribe(
                 file=audio_file,
                 model="whisper-1",
@@ -590,23 +697,12 @@ async def transcribe_audio(audio_binary: bytes, content_type: str = "audio/ogg")
             transcript = str(response)
         
         transcript = transcript.strip()
-        print(f"📝 Transcription result: '{transcript[:100]}...' " if len(transcript) > 100 else f"📝 Transcription result: '{transcript}'")
-        
-        # Cleanup temp files
-        try:
-            if os.path.exists(original_path):
-                os.remove(original_path)
-            if transcribe_path != original_path and os.path.exists(transcribe_path):
-                os.remove(transcribe_path)
-        except Exception as cleanup_error:
-            print(f"⚠️ Cleanup error: {cleanup_error}")
+        logger.debug("📝 Transcription result: '%.100s'", transcript)
         
         return transcript
         
     except Exception as e:
-        print(f"❌ Transcription Critical Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Transcription Critical Error: %s", e)
         return ""
 
 
@@ -614,30 +710,39 @@ async def transcribe_audio(audio_binary: bytes, content_type: str = "audio/ogg")
 # CATEGORY MAPPING
 # ==============================================================================
 
+CATEGORY_ALIASES = {
+    "water": "Water & Irrigation", "irrigation": "Water & Irrigation",
+    "agriculture": "Agriculture", "farming": "Agriculture",
+    "health": "Health & Sanitation", "hospital": "Health & Sanitation", "sanitation": "Health & Sanitation",
+    "education": "Education", "school": "Education",
+    "road": "Infrastructure & Roads", "infrastructure": "Infrastructure & Roads", "bridge": "Infrastructure & Roads",
+    "police": "Law & Order", "crime": "Law & Order", "safety": "Law & Order",
+    "pension": "Welfare Schemes", "ration": "Welfare Schemes", "welfare": "Welfare Schemes",
+    "electricity": "Electricity", "power": "Electricity", "current": "Electricity",
+    "forest": "Forests & Environment", "environment": "Forests & Environment",
+    "tax": "Finance & Taxation",
+    "urban": "Urban & Rural Development", "rural": "Urban & Rural Development",
+}
+CATEGORY_ALIAS_RANKS = {alias: rank for rank, alias in enumerate(CATEGORY_ALIASES)}
+CATEGORY_ALIAS_TARGETS = tuple(CATEGORY_ALIASES.values())
+CATEGORY_ALIAS_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(CATEGORY_ALIASES, key=len, reverse=True))) + "))",
+    re.IGNORECASE
+)
+
+
 def map_to_official_category(input_category: str) -> str:
     """Map any category string to one of the 11 official English categories"""
     if not input_category:
         return "Miscellaneous"
     
-    input_lower = input_category.lower()
-    
-    mappings = {
-        "water": "Water & Irrigation", "irrigation": "Water & Irrigation",
-        "agriculture": "Agriculture", "farming": "Agriculture",
-        "health": "Health & Sanitation", "hospital": "Health & Sanitation", "sanitation": "Health & Sanitation",
-        "education": "Education", "school": "Education",
-        "road": "Infrastructure & Roads", "infrastructure": "Infrastructure & Roads", "bridge": "Infrastructure & Roads",
-        "police": "Law & Order", "crime": "Law & Order", "safety": "Law & Order",
-        "pension": "Welfare Schemes", "ration": "Welfare Schemes", "welfare": "Welfare Schemes",
-        "electricity": "Electricity", "power": "Electricity", "current": "Electricity",
-        "forest": "Forests & Environment", "environment": "Forests & Environment",
-        "tax": "Finance & Taxation",
-        "urban": "Urban & Rural Development", "rural": "Urban & Rural Development",
-    }
-    
-    for key, official in mappings.items():
-        if key in input_lower:
-            return official
+    # Earliest alias in CATEGORY_ALIASES order wins, as with the old dict walk
+    rank = min(
+        (CATEGORY_ALIAS_RANKS[m.group(1).lower()] for m in CATEGORY_ALIAS_RE.finditer(input_category)),
+        default=None
+    )
+    if rank is not None:
+        return CATEGORY_ALIAS_TARGETS[rank]
     
     if input_category in OFFICIAL_CATEGORIES:
         return input_category
@@ -645,35 +750,57 @@ def map_to_official_category(input_category: str) -> str:
     return "Miscellaneous"
 
 
+CRITICAL_KEYWORDS = ("fire", "accident", "emergency", "death", "collapse", "danger")
+
+CATEGORY_KEYWORDS = {
+    "Water & Irrigation": ["water", "borewell", "tank", "pipeline", "నీరు", "पानी"],
+    "Agriculture": ["crop", "farmer", "farming", "రైతు", "किसान"],
+    "Health & Sanitation": ["hospital", "doctor", "garbage", "ఆసుపత్రి", "अस्पताल"],
+    "Education": ["school", "college", "teacher", "పాఠశాల", "स्कूल"],
+    "Infrastructure & Roads": ["road", "pothole", "bridge", "రోడ్డు", "सड़क"],
+    "Law & Order": ["police", "theft", "crime", "పోలీసు", "पुलिस"],
+    "Welfare Schemes": ["pension", "ration", "housing", "పింఛను", "पेंशन"],
+    "Electricity": ["electricity", "power", "transformer", "విద్యుత్", "बिजली"],
+}
+
+
+def _category_bucket(category: str) -> tuple:
+    if category in ("Health & Sanitation", "Law & Order", "Electricity"):
+        return (category, "CRITICAL", 4)
+    if category in ("Water & Irrigation", "Infrastructure & Roads"):
+        return (category, "HIGH", 24)
+    return (category, "MEDIUM", 72)
+
+
+# Result per rank: 0 = critical keyword, then CATEGORY_KEYWORDS order, last = no match
+CATEGORY_BUCKETS = (
+    ("Health & Sanitation", "CRITICAL", 4),
+    *(_category_bucket(category) for category in CATEGORY_KEYWORDS),
+    ("Miscellaneous", "LOW", 336),
+)
+KEYWORD_RANKS = {keyword: 0 for keyword in CRITICAL_KEYWORDS}
+for _rank, _keywords in enumerate(CATEGORY_KEYWORDS.values(), start=1):
+    for _keyword in _keywords:
+        KEYWORD_RANKS.setdefault(_keyword, _rank)
+
+# Zero-width lookahead reports a hit at every offset, so overlapping keywords
+# are all seen (same as the old `in` checks) in a single pass over the text
+CATEGORY_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(KEYWORD_RANKS, key=len, reverse=True))) + "))",
+    re.IGNORECASE
+)
+
+
 def categorize_text(text: str) -> tuple:
     """Quick categorization based on keywords"""
-    text_lower = text.lower()
-    
-    critical_keywords = ["fire", "accident", "emergency", "death", "collapse", "danger"]
-    if any(k in text_lower for k in critical_keywords):
-        return ("Health & Sanitation", "CRITICAL", 4)
-    
-    category_keywords = {
-        "Water & Irrigation": ["water", "borewell", "tank", "pipeline", "నీరు", "पानी"],
-        "Agriculture": ["crop", "farmer", "farming", "రైతు", "किसान"],
-        "Health & Sanitation": ["hospital", "doctor", "garbage", "ఆసుపత్రి", "अस्पताल"],
-        "Education": ["school", "college", "teacher", "పాఠశాల", "स्कूल"],
-        "Infrastructure & Roads": ["road", "pothole", "bridge", "రోడ్డు", "सड़क"],
-        "Law & Order": ["police", "theft", "crime", "పోలీసు", "पुलिस"],
-        "Welfare Schemes": ["pension", "ration", "housing", "పింఛను", "पेंशन"],
-        "Electricity": ["electricity", "power", "transformer", "విద్యుత్", "बिजली"],
-    }
-    
-    for category, keywords in category_keywords.items():
-        if any(k in text_lower for k in keywords):
-            if category in ["Health & Sanitation", "Law & Order", "Electricity"]:
-                return (category, "CRITICAL", 4)
-            elif category in ["Water & Irrigation", "Infrastructure & Roads"]:
-                return (category, "HIGH", 24)
-            else:
-                return (category, "MEDIUM", 72)
-    
-    return ("Miscellaneous", "LOW", 336)
+    best = len(CATEGORY_BUCKETS) - 1
+    for match in CATEGORY_KEYWORD_RE.finditer(text):
+        rank = KEYWORD_RANKS[match.group(1).lower()]
+        if rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return CATEGORY_BUCKETS[best]
 
 
 # ==============================================================================
@@ -776,66 +903,37 @@ async def process_image_with_vision(image_data: bytes, content_type: str) -> Dic
     Returns data in ENGLISH for database storage.
     """
     try:
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
-        
-        from emergentintegrations.llm.chat import ImageContent
+        image_base64 = await asyncio.to_thread(_b64_encode, image_data)
         
         image_content = ImageContent(image_base64=image_base64)
         
         chat = LlmChat(
             api_key=EMERGENT_LLM_KEY,
-            session_id=f"vision-analysis-{uuid.uuid4()}",
-            system_message="""You are an expert document analyzer for Indian government grievance systems.
-
-TASK: Extract grievance information in ENGLISH.
-
-RULES:
-1. Transliterate all names/places to English
-2. Use official English categories
-3. Describe issues in clear English
-4. Return valid language codes only: en/hi/hinglish/te/ta/kn/ml/bn
-
-OFFICIAL CATEGORIES:
-Water & Irrigation, Agriculture, Forests & Environment, Health & Sanitation, 
-Education, Infrastructure & Roads, Law & Order, Welfare Schemes, 
-Finance & Taxation, Urban & Rural Development, Electricity, Miscellaneous"""
+            session_id=f"vision-analysis-{token_hex(8)}",
+            system_message=IMAGE_ANALYSIS_SYSTEM_MESSAGE
         ).with_model("gemini", "gemini-2.0-flash")
         
         msg = UserMessage(
-            text="""Analyze this image and extract grievance information in ENGLISH.
-
-Return ONLY valid JSON (no markdown):
-{"name": "string or null", "contact": "string or null", "area": "string or null", "category": "string", "description": "string in ENGLISH", "urgency": "CRITICAL/HIGH/MEDIUM/LOW", "language": "en/hi/hinglish/te/ta/kn/ml/bn"}""",
+            text=IMAGE_ANALYSIS_PROMPT,
             file_contents=[image_content]
         )
         
         result = await chat.send_message(msg)
         
-        # Clean response
-        clean_result = result.strip()
-        if clean_result.startswith('```'):
-            clean_result = clean_result.split('```')[1]
-            if clean_result.startswith('json'):
-                clean_result = clean_result[4:]
-        clean_result = clean_result.replace('```', '').strip()
-        
-        extracted = json.loads(clean_result)
+        extracted = extract_json(result)
         
         # Ensure category is from official list
         if extracted.get('category') not in OFFICIAL_CATEGORIES:
             extracted['category'] = map_to_official_category(extracted.get('category', ''))
         
         # Normalize language code
-        valid_langs = ['en', 'hi', 'hinglish', 'te', 'tenglish', 'ta', 'kn', 'ml', 'bn', 'mr', 'gu', 'pa']
-        if extracted.get('language') not in valid_langs:
+        if extracted.get('language') not in SUPPORTED_LANGUAGES:
             extracted['language'] = 'en'
         
         return extracted
         
     except Exception as e:
-        print(f"❌ Vision analysis error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Vision analysis error: %s", e)
         return None
 
 
@@ -859,17 +957,13 @@ async def transcribe_endpoint(
         content = await upload_file.read()
         content_type = upload_file.content_type or "audio/webm"
         
-        print(f"🎤 Transcribe request: {len(content)} bytes, type: {content_type}")
+        logger.debug("🎤 Transcribe request: %d bytes, type: %s", len(content), content_type)
         
         transcript = await transcribe_audio(content, content_type)
         
         if transcript:
             detected_lang = detect_language(transcript)
-            lang_name = {
-                'te': 'Telugu', 'hi': 'Hindi', 'ta': 'Tamil',
-                'kn': 'Kannada', 'ml': 'Malayalam', 'bn': 'Bengali',
-                'en': 'English'
-            }.get(detected_lang, 'Unknown')
+            lang_name = DETECTED_LANGUAGE_NAMES.get(detected_lang, 'Unknown')
             
             # Translate to English if not already English
             english_translation = transcript
@@ -892,7 +986,7 @@ async def transcribe_endpoint(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Transcription endpoint error: {e}")
+        logger.error("❌ Transcription endpoint error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -910,17 +1004,13 @@ async def transcribe_audio_web_endpoint(
         content = await audio.read()
         content_type = audio.content_type or "audio/webm"
         
-        print(f"🎤 Web audio received: {len(content)} bytes, type: {content_type}")
+        logger.debug("🎤 Web audio received: %d bytes, type: %s", len(content), content_type)
         
         transcript = await transcribe_audio(content, content_type)
         
         if transcript:
             detected_lang = detect_language(transcript)
-            lang_name = {
-                'te': 'Telugu', 'hi': 'Hindi', 'ta': 'Tamil',
-                'kn': 'Kannada', 'ml': 'Malayalam', 'bn': 'Bengali',
-                'en': 'English'
-            }.get(detected_lang, 'Unknown')
+            lang_name = DETECTED_LANGUAGE_NAMES.get(detected_lang, 'Unknown')
             
             return {
                 "success": True,
@@ -932,5 +1022,5 @@ async def transcribe_audio_web_endpoint(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Web transcription error: {e}")
+        logger.error("❌ Web transcription error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
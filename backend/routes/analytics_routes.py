@@ -7,7 +7,7 @@ import asyncio
 from typing import List
 import sys
 sys.path.append('/app/backend')
-from services.sentiment_engine import analyze_social_sentiment, calculate_ground_stability
+from services.sentiment_engine import analyze_social_sentiment_batch, merge_sentiment_results, calculate_ground_stability
 
 router = APIRouter()
 
@@ -27,6 +27,119 @@ OFFICIAL_CATEGORIES = [
     "Miscellaneous"
 ]
 
+OFFICIAL_CATEGORIES_BY_LOWER = {cat.lower(): cat for cat in OFFICIAL_CATEGORIES}
+
+# STRICT MAPPING: Hindi, Telugu, and English variations
+STRICT_CATEGORY_MAPPINGS = {
+    # Water (English, Hindi, Telugu)
+    "water": "Water & Irrigation",
+    "irrigation": "Water & Irrigation",
+    "pani": "Water & Irrigation",           # Hindi
+    "jal": "Water & Irrigation",            # Hindi
+    "neeru": "Water & Irrigation",          # Telugu
+    "niru": "Water & Irrigation",           # Telugu
+    "borewell": "Water & Irrigation",
+    "tank": "Water & Irrigation",
+    "pipeline": "Water & Irrigation",
+    "drinking water": "Water & Irrigation",
+    "water supply": "Water & Irrigation",
+    
+    # Roads/Infrastructure (English, Hindi, Telugu)
+    "road": "Infrastructure & Roads",
+    "roads": "Infrastructure & Roads",
+    "sadak": "Infrastructure & Roads",      # Hindi - CRITICAL FIX
+    "sarak": "Infrastructure & Roads",      # Hindi variant
+    "roddu": "Infrastructure & Roads",      # Telugu
+    "bridge": "Infrastructure & Roads",
+    "infrastructure": "Infrastructure & Roads",
+    "pothole": "Infrastructure & Roads",
+    "street": "Infrastructure & Roads",
+    "highway": "Infrastructure & Roads",
+    
+    # Agriculture
+    "agriculture": "Agriculture",
+    "farming": "Agriculture",
+    "krishi": "Agriculture",                # Hindi
+    "kisan": "Agriculture",                 # Hindi
+    "rythu": "Agriculture",                 # Telugu
+    "farmer": "Agriculture",
+    "crop": "Agriculture",
+    
+    # Health
+    "health": "Health & Sanitation",
+    "sanitation": "Health & Sanitation",
+    "hospital": "Health & Sanitation",
+    "arogya": "Health & Sanitation",        # Hindi/Telugu
+    "swasthya": "Health & Sanitation",      # Hindi
+    "doctor": "Health & Sanitation",
+    "medical": "Health & Sanitation",
+    "garbage": "Health & Sanitation",
+    "drainage": "Health & Sanitation",
+    
+    # Education
+    "education": "Education",
+    "school": "Education",
+    "shiksha": "Education",                 # Hindi
+    "vidya": "Education",                   # Hindi/Telugu
+    "college": "Education",
+    "teacher": "Education",
+    
+    # Law & Order
+    "law": "Law & Order",
+    "police": "Law & Order",
+    "kanoon": "Law & Order",                # Hindi
+    "crime": "Law & Order",
+    "safety": "Law & Order",
+    "theft": "Law & Order",
+    
+    # Welfare
+    "welfare": "Welfare Schemes",
+    "pension": "Welfare Schemes",
+    "ration": "Welfare Schemes",
+    "scheme": "Welfare Schemes",
+    "yojana": "Welfare Schemes",            # Hindi
+    "housing": "Welfare Schemes",
+    "asara": "Welfare Schemes",             # Telugu scheme
+    "rythu bandhu": "Welfare Schemes",      # Telugu scheme
+    
+    # Electricity
+    "electricity": "Electricity",
+    "power": "Electricity",
+    "bijli": "Electricity",                 # Hindi
+    "vidyut": "Electricity",                # Hindi/Telugu
+    "current": "Electricity",
+    "transformer": "Electricity",
+    "light": "Electricity",
+    
+    # Environment
+    "forest": "Forests & Environment",
+    "environment": "Forests & Environment",
+    "van": "Forests & Environment",         # Hindi
+    "paryavaran": "Forests & Environment",  # Hindi
+    "pollution": "Forests & Environment",
+    "tree": "Forests & Environment",
+    
+    # Finance
+    "tax": "Finance & Taxation",
+    "finance": "Finance & Taxation",
+    "kar": "Finance & Taxation",            # Hindi
+    
+    # Development
+    "urban": "Urban & Rural Development",
+    "rural": "Urban & Rural Development",
+    "development": "Urban & Rural Development",
+    "vikas": "Urban & Rural Development",   # Hindi
+    "municipal": "Urban & Rural Development",
+    "panchayat": "Urban & Rural Development",
+    
+    # Miscellaneous
+    "general": "Miscellaneous",
+    "other": "Miscellaneous",
+    "others": "Miscellaneous",
+    "misc": "Miscellaneous",
+    "anya": "Miscellaneous",                # Hindi
+}
+
 def normalize_category(category: str) -> str:
     """
     STRICT Category Sanitization - Maps ANY category to official English.
@@ -40,129 +153,18 @@ def normalize_category(category: str) -> str:
         return category
     
     # Case-insensitive match
-    for official in OFFICIAL_CATEGORIES:
-        if category.lower() == official.lower():
-            return official
+    official = OFFICIAL_CATEGORIES_BY_LOWER.get(category.lower())
+    if official:
+        return official
     
-    # STRICT MAPPING: Hindi, Telugu, and English variations
     category_lower = category.lower().strip()
     
-    strict_mappings = {
-        # Water (English, Hindi, Telugu)
-        "water": "Water & Irrigation",
-        "irrigation": "Water & Irrigation",
-        "pani": "Water & Irrigation",           # Hindi
-        "jal": "Water & Irrigation",            # Hindi
-        "neeru": "Water & Irrigation",          # Telugu
-        "niru": "Water & Irrigation",           # Telugu
-        "borewell": "Water & Irrigation",
-        "tank": "Water & Irrigation",
-        "pipeline": "Water & Irrigation",
-        "drinking water": "Water & Irrigation",
-        "water supply": "Water & Irrigation",
-        
-        # Roads/Infrastructure (English, Hindi, Telugu)
-        "road": "Infrastructure & Roads",
-        "roads": "Infrastructure & Roads",
-        "sadak": "Infrastructure & Roads",      # Hindi - CRITICAL FIX
-        "sarak": "Infrastructure & Roads",      # Hindi variant
-        "roddu": "Infrastructure & Roads",      # Telugu
-        "bridge": "Infrastructure & Roads",
-        "infrastructure": "Infrastructure & Roads",
-        "pothole": "Infrastructure & Roads",
-        "street": "Infrastructure & Roads",
-        "highway": "Infrastructure & Roads",
-        
-        # Agriculture
-        "agriculture": "Agriculture",
-        "farming": "Agriculture",
-        "krishi": "Agriculture",                # Hindi
-        "kisan": "Agriculture",                 # Hindi
-        "rythu": "Agriculture",                 # Telugu
-        "farmer": "Agriculture",
-        "crop": "Agriculture",
-        
-        # Health
-        "health": "Health & Sanitation",
-        "sanitation": "Health & Sanitation",
-        "hospital": "Health & Sanitation",
-        "arogya": "Health & Sanitation",        # Hindi/Telugu
-        "swasthya": "Health & Sanitation",      # Hindi
-        "doctor": "Health & Sanitation",
-        "medical": "Health & Sanitation",
-        "garbage": "Health & Sanitation",
-        "drainage": "Health & Sanitation",
-        
-        # Education
-        "education": "Education",
-        "school": "Education",
-        "shiksha": "Education",                 # Hindi
-        "vidya": "Education",                   # Hindi/Telugu
-        "college": "Education",
-        "teacher": "Education",
-        
-        # Law & Order
-        "law": "Law & Order",
-        "police": "Law & Order",
-        "kanoon": "Law & Order",                # Hindi
-        "crime": "Law & Order",
-        "safety": "Law & Order",
-        "theft": "Law & Order",
-        
-        # Welfare
-        "welfare": "Welfare Schemes",
-        "pension": "Welfare Schemes",
-        "ration": "Welfare Schemes",
-        "scheme": "Welfare Schemes",
-        "yojana": "Welfare Schemes",            # Hindi
-        "housing": "Welfare Schemes",
-        "asara": "Welfare Schemes",             # Telugu scheme
-        "rythu bandhu": "Welfare Schemes",      # Telugu scheme
-        
-        # Electricity
-        "electricity": "Electricity",
-        "power": "Electricity",
-        "bijli": "Electricity",                 # Hindi
-        "vidyut": "Electricity",                # Hindi/Telugu
-        "current": "Electricity",
-        "transformer": "Electricity",
-        "light": "Electricity",
-        
-        # Environment
-        "forest": "Forests & Environment",
-        "environment": "Forests & Environment",
-        "van": "Forests & Environment",         # Hindi
-        "paryavaran": "Forests & Environment",  # Hindi
-        "pollution": "Forests & Environment",
-        "tree": "Forests & Environment",
-        
-        # Finance
-        "tax": "Finance & Taxation",
-        "finance": "Finance & Taxation",
-        "kar": "Finance & Taxation",            # Hindi
-        
-        # Development
-        "urban": "Urban & Rural Development",
-        "rural": "Urban & Rural Development",
-        "development": "Urban & Rural Development",
-        "vikas": "Urban & Rural Development",   # Hindi
-        "municipal": "Urban & Rural Development",
-        "panchayat": "Urban & Rural Development",
-        
-        # Miscellaneous
-        "general": "Miscellaneous",
-        "other": "Miscellaneous",
-        "others": "Miscellaneous",
-        "misc": "Miscellaneous",
-        "anya": "Miscellaneous",                # Hindi
-    }
-    
     # Check for exact match first
-    if category_lower in strict_mappings:
-        return strict_mappings[category_lower]
+    if category_lower in STRICT_CATEGORY_MAPPINGS:
+        return STRICT_CATEGORY_MAPPINGS[category_lower]
     
     # Check for keyword containment
-    for key, official in strict_mappings.items():
+    for key, official in STRICT_CATEGORY_MAPPINGS.items():
         if key in category_lower:
             return official
     
@@ -340,22 +342,15 @@ async def fetch_social_media_sentiment():
         data = response.json()
         posts = data.get("data", [])
         
-        all_comments = []
-        total_reactions = {"like": 0, "love": 0, "haha": 0, "wow": 0, "sad": 0, "angry": 0}
-        post_context = ""
-        
+        # One item per post so each post's comments are read against its own caption
+        items = []
         for post in posts:
-            # Collect comments
-            comments_data = post.get("comments", {}).get("data", [])
-            for c in comments_data:
-                all_comments.append(c.get("message", ""))
-            
-            # Get post context
-            if not post_context:
-                post_context = post.get("message", "Political post")[:200]
+            comments = [c.get("message", "") for c in post.get("comments", {}).get("data", [])]
+            post_context = post.get("message", "Political post")[:200]
+            items.append((post_context, comments, {"like": 0, "love": 0, "haha": 0, "wow": 0, "sad": 0, "angry": 0}))
         
-        # Use sentiment engine
-        sentiment_result = await analyze_social_sentiment(post_context, all_comments, total_reactions)
+        # Use sentiment engine (single LLM call for all posts)
+        sentiment_result = merge_sentiment_results(await analyze_social_sentiment_batch(items))
         
         return {
             "positive": sentiment_result.get("positive_count", 0),
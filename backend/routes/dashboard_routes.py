@@ -6,6 +6,9 @@ from database import get_supabase
 
 router = APIRouter()
 
+# Single-tenant deployment: the politician never changes at runtime
+POLITICIAN_ID = os.getenv("POLITICIAN_ID", "6e56793a-558b-4834-ab0d-36387159653a")
+
 
 class DraftRequest(BaseModel):
     topic: str = None
@@ -21,11 +24,10 @@ async def get_critical_grievances():
     """
     try:
         supabase = get_supabase()
-        pid = os.getenv("POLITICIAN_ID", "6e56793a-558b-4834-ab0d-36387159653a")
         
         response = supabase.table("grievances")\
             .select("id, issue_type, village, description, priority_level, created_at")\
-            .eq("politician_id", pid)\
+            .eq("politician_id", POLITICIAN_ID)\
             .or_("priority_level.eq.CRITICAL,priority_level.eq.HIGH")\
             .order("created_at", desc=True)\
             .limit(5)\
@@ -44,12 +46,11 @@ async def get_dashboard_stats():
     """
     try:
         supabase = get_supabase()
-        pid = os.getenv("POLITICIAN_ID", "6e56793a-558b-4834-ab0d-36387159653a")
         
         # Get grievance counts by status
         grievances = supabase.table("grievances")\
             .select("status, priority_level")\
-            .eq("politician_id", pid)\
+            .eq("politician_id", POLITICIAN_ID)\
             .execute()
         
         data = grievances.data or []
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List
+from supabase import Client
 from database import get_supabase
 from auth import get_current_user, TokenData
 from datetime import datetime, timezone
@@ -29,12 +30,12 @@ class GrievanceUpdate(BaseModel):
 @router.post("/")
 async def create_grievance(
     data: GrievanceCreate,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     if not current_user.politician_id:
         raise HTTPException(status_code=403, detail="User not associated with a politician")
     
-    supabase = get_supabase()
     grievance_id = str(uuid.uuid4())
     
     # Use location or village for backward compatibility
@@ -64,7 +65,8 @@ async def create_grievance(
 @router.delete("/{grievance_id}")
 async def delete_grievance(
     grievance_id: str,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Delete a grievance permanently.
@@ -73,8 +75,6 @@ async def delete_grievance(
     if not current_user.politician_id:
         raise HTTPException(status_code=403, detail="User not associated with a politician")
     
-    supabase = get_supabase()
-    
     # Verify the grievance belongs to this politician
     existing = supabase.table('grievances').select('id').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
@@ -89,12 +89,12 @@ async def delete_grievance(
 @router.get("/")
 async def get_grievances(
     status: Optional[str] = None,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     if not current_user.politician_id:
         raise HTTPException(status_code=403, detail="User not associated with a politician")
     
-    supabase = get_supabase()
     query = supabase.table('grievances').select('*').eq('politician_id', current_user.politician_id)
     
     if status:
@@ -104,15 +104,23 @@ async def get_grievances(
     return result.data
 
 @router.get("/metrics")
-async def get_grievance_metrics(current_user: TokenData = Depends(get_current_user)):
+async def get_grievance_metrics(current_user: TokenData = Depends(get_current_user), supabase: Client = Depends(get_supabase)):
     """
     Get comprehensive metrics for grievances including resolved, unresolved, and long pending
     """
     if not current_user.politician_id:
         raise HTTPException(status_code=403, detail="User not associated with a politician")
     
-    supabase = get_supabase()
-    all_grievances = supabase.table('grievances').select('*').eq('politician_id', current_user.politician_id).execute()
+    # Only the columns the metrics read; descriptions and media URLs stay in the database
+    try:
+        all_grievances = supabase.table('grievances').select('status,created_at,resolved_at').eq('politician_id', current_user.politician_id).execute()
+    except Exception as e:
+        # If resolved_at column doesn't exist, select without it (resolution time then reads 0)
+        if 'resolved_at' in str(e):
+            print("⚠️ resolved_at column not in schema, computing metrics without it")
+            all_grievances = supabase.table('grievances').select('status,created_at').eq('politician_id', current_user.politician_id).execute()
+        else:
+            raise
     
     total = len(all_grievances.data)
     
@@ -166,9 +174,9 @@ async def get_grievance_metrics(current_user: TokenData = Depends(get_current_us
 @router.get("/{grievance_id}")
 async def get_grievance(
     grievance_id: str,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
-    supabase = get_supabase()
     result = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     
     if not result.data:
@@ -180,10 +188,9 @@ async def get_grievance(
 async def update_grievance(
     grievance_id: str,
     data: GrievanceUpdate,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -202,11 +209,10 @@ async def update_grievance(
     return {"message": "Grievance updated successfully"}
 
 @router.get("/stats/overview")
-async def get_grievance_stats(current_user: TokenData = Depends(get_current_user)):
+async def get_grievance_stats(current_user: TokenData = Depends(get_current_user), supabase: Client = Depends(get_supabase)):
     if not current_user.politician_id:
         raise HTTPException(status_code=403, detail="User not associated with a politician")
     
-    supabase = get_supabase()
     all_grievances = supabase.table('grievances').select('status').eq('politician_id', current_user.politician_id).execute()
     
     total = len(all_grievances.data)
@@ -230,13 +236,12 @@ class AssignmentRequest(BaseModel):
 async def assign_grievance(
     grievance_id: str,
     data: AssignmentRequest,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Feature B: Deep Link Assignment - Update ticket status and record assignee phone
     """
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -262,13 +267,12 @@ class StartWorkRequest(BaseModel):
 async def start_work(
     grievance_id: str,
     data: StartWorkRequest = None,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Step 8: OSD/PA clicks 'Start Work' - Updates status to IN_PROGRESS
     """
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -290,13 +294,12 @@ class UploadResolutionRequest(BaseModel):
 async def upload_resolution_photo(
     grievance_id: str,
     data: UploadResolutionRequest,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Step 8: Upload photo verification before marking resolved
     """
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -318,14 +321,13 @@ class ResolveRequest(BaseModel):
 async def resolve_grievance(
     grievance_id: str,
     data: ResolveRequest = None,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Step 8-9: Mark grievance as resolved (requires photo verification first)
     Sends WhatsApp notification to citizen in their NATIVE LANGUAGE
     """
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -378,7 +380,8 @@ class FeedbackRequest(BaseModel):
 async def record_feedback(
     grievance_id: str,
     data: FeedbackRequest,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Step 10: Record citizen feedback rating (1-5)
@@ -386,8 +389,6 @@ async def record_feedback(
     if data.rating < 1 or data.rating > 5:
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -404,23 +405,44 @@ async def record_feedback(
 # ==============================================================================
 from fastapi import UploadFile, File
 import os
-import httpx
+import json
+import time
+import secrets
+from jose import jwt
+from http_client import with_retry, get_supabase_http
 
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
+SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET')
 STORAGE_BUCKET = os.environ.get('STORAGE_BUCKET', 'Grievances')
+SIGNED_URL_EXPIRES_IN = 604800  # 7 days
+
+
+def sign_storage_url_locally(file_name: str, expires_in: int = SIGNED_URL_EXPIRES_IN) -> str:
+    """
+    Build a Supabase Storage signed URL without the /object/sign round-trip.
+    Storage tokens are HS256 JWTs over {"url": "<bucket>/<path>"} signed with the project JWT secret.
+    """
+    now = int(time.time())
+    token = jwt.encode(
+        {"url": f"{STORAGE_BUCKET}/{file_name}", "iat": now, "exp": now + expires_in},
+        SUPABASE_JWT_SECRET,
+        algorithm='HS256'
+    )
+    return f"{SUPABASE_URL}/storage/v1/object/sign/{STORAGE_BUCKET}/{file_name}?token={token}"
+
+# File types accepted by the grievance analysis endpoint
+ANALYSIS_EXTENSIONS = frozenset({'pdf', 'png', 'jpg', 'jpeg'})
 
 @router.post("/{grievance_id}/upload-file")
 async def upload_resolution_file(
     grievance_id: str,
     file: UploadFile = File(...),
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase)
 ):
     """
     Upload resolution photo from device (not just URL)
     """
-    supabase = get_supabase()
-    
     existing = supabase.table('grievances').select('*').eq('id', grievance_id).eq('politician_id', current_user.politician_id).execute()
     if not existing.data:
         raise HTTPException(status_code=404, detail="Grievance not found")
@@ -430,43 +452,35 @@ async def upload_resolution_file(
     content_type = file.content_type or 'image/jpeg'
     
     # Generate unique filename
-    import random
-    import string
-    random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=7))
+    random_suffix = secrets.token_hex(4)
     extension = file.filename.split('.')[-1] if file.filename else 'jpg'
-    file_name = f"resolution/{int(datetime.now().timestamp())}_{random_suffix}.{extension}"
-    
-    # Upload to Supabase Storage
-    upload_url = f"{SUPABASE_URL}/storage/v1/object/{STORAGE_BUCKET}/{file_name}"
-    
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        upload_response = await client.post(
-            upload_url,
-            headers={
-                'Authorization': f'Bearer {SUPABASE_SERVICE_KEY}',
-                'Content-Type': content_type
-            },
-            content=content
-        )
-        
-        if upload_response.status_code not in [200, 201]:
-            raise HTTPException(status_code=500, detail=f"Upload failed: {upload_response.text}")
-        
-        # Generate signed URL
-        sign_url = f"{SUPABASE_URL}/storage/v1/object/sign/{STORAGE_BUCKET}/{file_name}"
-        sign_response = await client.post(
-            sign_url,
-            headers={
-                'Authorization': f'Bearer {SUPABASE_SERVICE_KEY}',
-                'Content-Type': 'application/json'
-            },
-            json={"expiresIn": 604800}
-        )
+    file_name = f"resolution/{time.time_ns() // 1_000_000_000}_{random_suffix}.{extension}"
+    
+    # Upload to Supabase Storage over the shared (service-key authenticated) pool
+    client = get_supabase_http()
+    upload_response = await with_retry(lambda: client.post(
+        f"/storage/v1/object/{STORAGE_BUCKET}/{file_name}",
+        headers={'Content-Type': content_type},
+        content=content
+    ))
+    
+    if upload_response.status_code not in [200, 201]:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {upload_response.text}")
+    
+    # Generate signed URL (locally when the JWT secret is configured)
+    if SUPABASE_JWT_SECRET:
+        file_url = sign_storage_url_locally(file_name)
+    else:
+        sign_response = await with_retry(lambda: client.post(
+            f"/storage/v1/object/sign/{STORAGE_BUCKET}/{file_name}",
+            json={"expiresIn": SIGNED_URL_EXPIRES_IN}
+        ))
         
         if sign_response.status_code == 200:
-            sign_data = sign_response.json()
-            file_url = f"{SUPABASE_URL}/storage/v1{sign_data.get('signedURL', '')}"
+            signed_path = json.loads(sign_response.content).get('signedURL', '')
+            file_url = f"{SUPABASE_URL}/storage/v1{signed_path}"
         else:
+            print(f"⚠️ Signed URL failed: {sign_response.status_code} {sign_response.reason_phrase}")
             file_url = f"{SUPABASE_URL}/storage/v1/object/public/{STORAGE_BUCKET}/{file_name}"
     
     # Update grievance with resolution photo URL
@@ -503,8 +517,7 @@ async def analyze_grievance_file(
         ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
         
         # Validate file type
-        allowed_extensions = {'pdf', 'png', 'jpg', 'jpeg'}
-        if ext not in allowed_extensions:
+        if ext not in ANALYSIS_EXTENSIONS:
             raise HTTPException(status_code=400, detail=f"Invalid format. Use PDF, JPG, PNG. Got: {ext}")
         
         print(f"📄 Analyzing grievance file: {filename}, type: {content_type}, size: {len(content)} bytes")
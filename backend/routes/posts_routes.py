@@ -13,6 +13,9 @@ FB_PAGE_ACCESS_TOKEN = os.getenv("FACEBOOK_PAGE_ACCESS_TOKEN")
 FB_PAGE_ID = os.getenv("FACEBOOK_PAGE_ID")
 IG_ACCOUNT_ID = os.getenv("INSTAGRAM_ACCOUNT_ID")
 
+# Public URL prefix for uploaded campaign images (SUPABASE_URL may carry the REST path)
+CAMPAIGN_ASSETS_URL = (os.getenv("SUPABASE_URL") or "").replace("/rest/v1", "") + "/storage/v1/object/public/campaign-assets"
+
 @router.post("/publish")
 async def publish_post(
     content: str = Form(...),
@@ -38,9 +41,7 @@ async def publish_post(
             file_name = f"{uuid.uuid4()}.{file_ext}"
             file_content = await image.read()
             supabase.storage.from_("campaign-assets").upload(file_name, file_content)
-            project_url = os.getenv("SUPABASE_URL") 
-            base_url = project_url.replace("/rest/v1", "") if project_url else ""
-            image_url = f"{base_url}/storage/v1/object/public/campaign-assets/{file_name}"
+            image_url = f"{CAMPAIGN_ASSETS_URL}/{file_name}"
             print(f"✅ Image uploaded: {image_url}")
         except Exception as e:
             print(f"⚠️ Image Upload Warning: {e}")
@@ -8,6 +8,9 @@ from database import get_supabase
 
 router = APIRouter()
 
+# Single-tenant deployment: the politician never changes at runtime
+POLITICIAN_ID = os.getenv("POLITICIAN_ID", "6e56793a-558b-4834-ab0d-36387159653a")
+
 class AnalysisRequest(BaseModel):
     text: str
     platform: str = "Generic"  # e.g., Twitter, WhatsApp, Facebook
@@ -40,7 +43,6 @@ async def analyze_sentiment(request: AnalysisRequest):
         
         # 3. Database Aggregation (Read-Modify-Write)
         today_str = date.today().isoformat()
-        politician_id = os.getenv("POLITICIAN_ID", "6e56793a-558b-4834-ab0d-36387159653a")
         
         db_success = False
         try:
@@ -48,7 +50,7 @@ async def analyze_sentiment(request: AnalysisRequest):
             existing = supabase.table("sentiment_analytics").select("*")\
                 .eq("report_date", today_str)\
                 .eq("platform", request.platform)\
-                .eq("politician_id", politician_id)\
+                .eq("politician_id", POLITICIAN_ID)\
                 .execute()
             
             if existing.data:
@@ -64,7 +66,7 @@ async def analyze_sentiment(request: AnalysisRequest):
             else:
                 # Create new row for the day
                 new_row = {
-                    "politician_id": politician_id,
+                    "politician_id": POLITICIAN_ID,
                     "platform": request.platform,
                     "report_date": today_str,
                     "positive_count": 1 if sentiment_category == "positive" else 0,
@@ -98,11 +100,10 @@ async def get_happiness_data():
     """
     try:
         supabase = get_supabase()
-        politician_id = os.getenv("POLITICIAN_ID", "6e56793a-558b-4834-ab0d-36387159653a")
         
         response = supabase.table("sentiment_analytics")\
             .select("*")\
-            .eq("politician_id", politician_id)\
+            .eq("politician_id", POLITICIAN_ID)\
             .order("created_at", desc=True)\
             .limit(7)\
             .execute()
@@ -5,8 +5,10 @@ from database import get_supabase
 from auth import get_current_user, TokenData
 import os
 import base64
+import asyncio
 from emergentintegrations.llm.chat import LlmChat, UserMessage
-import httpx
+from http_client import get_twilio_http, get_default_http
+from routes.ai_routes import extract_json
 from datetime import datetime, timezone
 
 router = APIRouter()
@@ -137,9 +139,7 @@ Respond ONLY with valid JSON."""
         user_message = UserMessage(text=prompt, image_base64=after_photo_base64)
         response = await chat.send_message(user_message)
         
-        import json
-        result = json.loads(response.replace('```json', '').replace('```', '').strip())
-        return result
+        return extract_json(response)
         
     except Exception as e:
         print(f"❌ Single photo verification error: {e}")
@@ -160,18 +160,13 @@ async def verify_before_after(
     Compare before and after photos to verify resolution
     """
     try:
-        # Download before photo
-        from routes.whatsapp_routes import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN
+        # Download before photo (Twilio media needs the account credentials)
+        client = get_twilio_http() if 'twilio.com' in before_url else get_default_http()
+        response = await client.get(before_url)
+        before_image_data = response.content
         
-        async with httpx.AsyncClient() as client:
-            if 'twilio.com' in before_url:
-                auth = (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-                response = await client.get(before_url, auth=auth, timeout=30.0)
-            else:
-                response = await client.get(before_url, timeout=30.0)
-            before_image_data = response.content
-        
-        before_photo_base64 = base64.b64encode(before_image_data).decode('utf-8')
+        # Encode off the event loop; base64 output is pure ASCII, so skip UTF-8 decoding
+        before_photo_base64 = (await asyncio.to_thread(base64.b64encode, before_image_data)).decode('ascii')
         
         # Use Gemini Vision for before/after comparison
         chat = LlmChat(
@@ -219,9 +214,7 @@ Respond ONLY with valid JSON."""
         )
         response = await chat.send_message(user_message_after)
         
-        import json
-        result = json.loads(response.replace('```json', '').replace('```', '').strip())
-        return result
+        return extract_json(response)
         
     except Exception as e:
         print(f"❌ Before/after verification error: {e}")
@@ -9,20 +9,23 @@ The bot now acts like a professional Officer on Special Duty (OSD):
 - Does NOT register "Thank you" or greetings as grievances
 - Sends resolution notifications in user's original language
 """
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 from database import get_supabase
-from twilio.rest import Client
-from twilio.twiml.messaging_response import MessagingResponse
+from http_client import with_retry, get_twilio_http, get_supabase_http, get_twilio_rest
+from cachetools import TTLCache
+from xml.sax.saxutils import escape as xml_escape
 import os
-import uuid
-import json
-import httpx
+import re
+from uuid import uuid4
 import random
-import string
+import secrets
+import time
 import asyncio
+import logging
 from datetime import datetime, timezone, timedelta
+from contextlib import asynccontextmanager
 from fastapi.responses import Response
 
 # Import the OSD Brain
@@ -38,92 +41,301 @@ from routes.ai_routes import (
 )
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Configuration
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
 TWILIO_WHATSAPP_NUMBER = os.environ.get('TWILIO_WHATSAPP_NUMBER')
-EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
+# Optional Messaging Service: lets Twilio pick from a sender pool and queue outbound sends
+TWILIO_MESSAGING_SERVICE_SID = os.environ.get('TWILIO_MESSAGING_SERVICE_SID')
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
 
-twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+# Twilio's WhatsApp sender throughput is ~25 messages/second; cap in-flight sends to match
+TWILIO_SEND_CONCURRENCY = 25
+
+# Sender parameters for messages.create, resolved once
+TWILIO_SENDER = (
+    {'messaging_service_sid': TWILIO_MESSAGING_SERVICE_SID} if TWILIO_MESSAGING_SERVICE_SID
+    else {'from_': TWILIO_WHATSAPP_NUMBER}
+)
+
+_twilio_send_semaphore = asyncio.Semaphore(TWILIO_SEND_CONCURRENCY)
+
+# Media pipelines (download + OCR/transcription) one sender may run at once, so a citizen
+# forwarding a batch of voice notes cannot hog the shared OCR/Whisper capacity
+SENDER_MEDIA_CONCURRENCY = 2
+_sender_media_slots: Dict[str, list] = {}  # phone -> [semaphore, holders + waiters]
+
+# Known Indian language codes - anything else falls back to English
+VALID_LANGUAGES = frozenset({'en', 'hi', 'hinglish', 'te', 'tenglish', 'ta', 'kn', 'ml', 'bn', 'mr', 'gu', 'pa'})
+
+# Markers of a hallucinated European-language translation
+FOREIGN_MARKERS = (
+    'constatat', 'nemulțumirea', 'înregistrat', 'dumneavoastră',
+    'je suis', 'nous', 'vous', 'merci', 'bonjour',
+    'gracias', 'hola', 'danke', 'bitte'
+)
+
+STATUS_EMOJIS = {'PENDING': '⏳', 'IN_PROGRESS': '🔄', 'RESOLVED': '✅', 'ASSIGNED': '👤'}
+# Only the columns the status reply prints (descriptions/media URLs can be large)
+STATUS_COLUMNS = 'id,status,category,created_at'
+
+RATING_WORDS = {
+    'excellent': 5, 'great': 5, 'amazing': 5, 'perfect': 5,
+    'good': 4, 'satisfied': 4, 'happy': 4,
+    'okay': 3, 'ok': 3, 'average': 3,
+    'bad': 2, 'poor': 2, 'unsatisfied': 2,
+    'terrible': 1, 'worst': 1, 'horrible': 1
+}
+RATING_RE = re.compile(r'\b([1-5])\b')
+
+MEDIA_DOWNLOAD_ATTEMPTS = 3
+
+# Twilio MessageSids already accepted, so a re-delivered webhook is not processed twice
+SEEN_MESSAGE_TTL_SECONDS = 3600
+SEEN_MESSAGE_SIDS = TTLCache(maxsize=4096, ttl=SEEN_MESSAGE_TTL_SECONDS)
+
+# Immediate TwiML acknowledgement for media, whose download + OCR/transcription takes a while
+MEDIA_ACK_MESSAGE = "We have received your message and are reviewing it. You will get a reply shortly."
+WEBHOOK_ERROR_MESSAGE = "I apologize for the inconvenience. Please try again in a moment."
+
+# The webhook only ever answers with these fixed TwiML bodies, so render them once
+# (same bytes as twilio's MessagingResponse builder)
+TWIML_MESSAGE_TEMPLATE = '<?xml version="1.0" encoding="UTF-8"?><Response><Message>{}</Message></Response>'
+EMPTY_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response />'
+MEDIA_ACK_TWIML = TWIML_MESSAGE_TEMPLATE.format(xml_escape(MEDIA_ACK_MESSAGE))
+WEBHOOK_ERROR_TWIML = TWIML_MESSAGE_TEMPLATE.format(xml_escape(WEBHOOK_ERROR_MESSAGE))
+
+# Storage file extensions for the media types WhatsApp delivers; others use the MIME subtype
+MEDIA_EXTENSIONS = {
+    'image/jpeg': 'jpeg', 'image/png': 'png', 'image/webp': 'webp', 'image/gif': 'gif',
+    'audio/ogg': 'ogg', 'audio/mpeg': 'mp3', 'audio/amr': 'amr', 'audio/mp4': 'mp4',
+    'video/mp4': 'mp4', 'application/pdf': 'pdf'
+}
+
+# One pass over the Twilio content type; Twilio voice notes are OGG, which can also show up only in the URL
+MEDIA_KIND_RE = re.compile(r'(?P<audio>audio)|(?P<pdf>pdf)|(?P<image>image)', re.IGNORECASE)
+OGG_URL_RE = re.compile(r'ogg', re.IGNORECASE)
+
+# Bare greetings are answered without an LLM round-trip
+GREETINGS = frozenset({'hi', 'hello', 'hey', 'namaste'})
+
+GREETING_BODY = """Thank you for reaching out to the Office of the Leader. We truly appreciate you taking the time to connect with us.
+
+We are here to support you. You may share your query or register a grievance, and our team will carefully look into the matter and assist you as soon as possible."""
+GREETING_TEMPLATE = "Namaste, {name}.\n" + GREETING_BODY
+ANONYMOUS_GREETING = "Namaste.\n" + GREETING_BODY
+
+# Citizen-friendly OSD replies (translated per message when the citizen is not writing in English)
+OSD_RESPONSES = {
+    # Chat/general response
+    "chat_default": "I'm here to assist you. How may I help you today?",
+    
+    # Query assistance
+    "query_default": "I'd be happy to help with information. Could you please specify which scheme or process you'd like to know about?",
+    
+    # Feedback thanks
+    "feedback_thanks": "Thank you for your valuable feedback. We are committed to serving you better.",
+    
+    # Voice error
+    "voice_error": "I received your voice message but could not process it clearly. Please try again or type your message.",
+    
+    # Media error
+    "media_error": "I received your document but could not extract the information. Please describe your issue in text.",
+    
+    # Clarification needed
+    "clarification": "I'm here to help. Could you please provide more details about your concern?",
+    
+    # Status check - no grievance found
+    "no_grievance": "I could not find any recent grievance registered with your number. Would you like to register a new one?",
+}
+
+# Reply when a voice note could not be transcribed (language guessed from any text sent with it)
+VOICE_UNCLEAR_REPLIES = {
+    'en': "Sorry, I could not understand your voice message. Please try again or type your message.",
+    'other': "Maaf kijiye, aapka voice message samajh nahi aaya. Kripya dobara bhejein ya text mein likhein.",
+}
+
+
+# ==============================================================================
+# POLITICIAN LOOKUP
+# ==============================================================================
+
+# Single-tenant bot: the politician id practically never changes, so it is looked up at
+# most once per TTL (short enough that a re-seeded politicians table is picked up)
+POLITICIAN_ID_TTL_SECONDS = 300
+_politician_id_cache = TTLCache(maxsize=1, ttl=POLITICIAN_ID_TTL_SECONDS)
+
+
+async def get_default_politician_id(supabase) -> Optional[str]:
+    """Return the default politician id, hitting Supabase at most once per TTL"""
+    politician_id = _politician_id_cache.get('default')
+    if politician_id is None:
+        politicians = await asyncio.to_thread(
+            lambda: supabase.table('politicians').select('id').limit(1).execute()
+        )
+        if politicians.data:
+            politician_id = _politician_id_cache['default'] = politicians.data[0]['id']
+    return politician_id
 
 
 # ==============================================================================
 # MEDIA DOWNLOAD HELPER
 # ==============================================================================
 
-async def download_twilio_media(url: str, client: httpx.AsyncClient) -> dict:
-    """Download media from Twilio"""
+def classify_media(content_type: str, url: str) -> Optional[str]:
+    """Return 'audio', 'pdf', 'image' or None for an incoming Twilio media item"""
+    if OGG_URL_RE.search(url):
+        return 'audio'
+    match = MEDIA_KIND_RE.search(content_type)
+    return match.lastgroup if match else None
+
+
+async def download_twilio_media(url: str) -> dict:
+    """
+    Download media from Twilio, retrying with capped exponential backoff and jitter.
+    Re-delivered webhooks never get here (SEEN_MESSAGE_SIDS), so each URL is fetched once.
+    """
     if not url:
         return None
     
-    auth = (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+    client = get_twilio_http()
     
-    for attempt in range(3):
+    for attempt in range(MEDIA_DOWNLOAD_ATTEMPTS):
         try:
-            response = await client.get(url, auth=auth, follow_redirects=True, timeout=60.0)
+            response = await client.get(url)
             if response.status_code == 200 and len(response.content) > 0:
                 content_type = response.headers.get('content-type', 'application/octet-stream')
                 if 'xml' not in content_type.lower():
                     return {'buffer': response.content, 'content_type': content_type}
-            await asyncio.sleep(2)
+            elif response.status_code in (401, 403):
+                # Bad credentials won't fix themselves on retry
+                logger.warning("⚠️ Media download rejected with HTTP %d", response.status_code)
+                return None
+            else:
+                # httpx already followed Twilio's redirect to the media CDN; show where it failed
+                logger.info(
+                    "⚠️ Media download attempt %d got HTTP %d from %s (redirects: %s)",
+                    attempt + 1, response.status_code, response.url.host,
+                    [r.status_code for r in response.history]
+                )
         except Exception as e:
-            print(f"⚠️ Media download attempt {attempt+1} failed: {e}")
-            await asyncio.sleep(2)
+            logger.warning("⚠️ Media download attempt %d failed: %s", attempt + 1, e)
+        
+        if attempt < MEDIA_DOWNLOAD_ATTEMPTS - 1:
+            await asyncio.sleep(min(0.25 * 2 ** attempt, 2.0) + random.random() * 0.1)
     
     return None
 
 
-async def upload_to_storage(file_obj: dict, folder: str, client: httpx.AsyncClient) -> str:
+def build_storage_path(content_type: str, folder: str) -> str:
+    """Unique object path inside the Grievances bucket"""
+    random_suffix = secrets.token_hex(4)
+    mime_type = content_type.partition(';')[0].strip()
+    extension = MEDIA_EXTENSIONS.get(mime_type) or mime_type.rpartition('/')[2]
+    
+    return f"{folder}/{time.time_ns() // 1_000_000_000}_{random_suffix}.{extension}"
+
+
+async def upload_to_storage(file_obj: dict, folder: str) -> str:
     """Upload to Supabase storage"""
-    random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=7))
-    extension = file_obj['content_type'].split('/')[-1].split(';')[0]
-    if extension == 'mpeg': extension = 'mp3'
-    
-    file_name = f"{folder}/{int(datetime.now().timestamp())}_{random_suffix}.{extension}"
-    upload_url = f"{SUPABASE_URL}/storage/v1/object/Grievances/{file_name}"
-    
-    await client.post(
-        upload_url,
-        headers={'Authorization': f'Bearer {SUPABASE_SERVICE_KEY}', 'Content-Type': file_obj['content_type']},
-        content=file_obj['buffer'],
-        timeout=60.0
-    )
+    file_name = build_storage_path(file_obj['content_type'], folder)
+    client = get_supabase_http()
+    
+    await with_retry(lambda: client.post(
+        f"/storage/v1/object/Grievances/{file_name}",
+        headers={'Content-Type': file_obj['content_type']},
+        content=file_obj['buffer']
+    ))
     
     return f"{SUPABASE_URL}/storage/v1/object/public/Grievances/{file_name}"
 
 
+async def store_media(file_obj: dict, folder: str) -> Optional[str]:
+    """Upload media and return its public URL, or None if storage is unavailable"""
+    try:
+        return await upload_to_storage(file_obj, folder)
+    except Exception as e:
+        logger.warning("⚠️ Storage upload failed: %s", e)
+        return None
+
+
+async def stream_media_to_storage(url: str, folder: str) -> Optional[str]:
+    """
+    Pipe Twilio media straight into Supabase storage in 64 KB chunks.
+    Used for media we only archive, so the body is never held in memory.
+    """
+    try:
+        async with get_twilio_http().stream("GET", url) as source:
+            if source.status_code != 200:
+                logger.warning("⚠️ Media stream got HTTP %d", source.status_code)
+                return None
+            
+            content_type = source.headers.get('content-type', 'application/octet-stream')
+            file_name = build_storage_path(content_type, folder)
+            await get_supabase_http().post(
+                f"/storage/v1/object/Grievances/{file_name}",
+                headers={'Content-Type': content_type},
+                content=source.aiter_bytes(64 * 1024)
+            )
+    except Exception as e:
+        logger.warning("⚠️ Media stream to storage failed: %s", e)
+        return None
+    
+    return f"{SUPABASE_URL}/storage/v1/object/public/Grievances/{file_name}"
+
+
+async def send_whatsapp_text(to_number: str, body: str):
+    """Send a WhatsApp message over Twilio's async transport (no worker thread per send)"""
+    async with _twilio_send_semaphore:
+        return await get_twilio_rest().messages.create_async(body=body, to=to_number, **TWILIO_SENDER)
+
+
 # ==============================================================================
 # MAIN WEBHOOK - THE OSD PERSONA
 # ==============================================================================
 
 @router.post("/webhook")
-async def whatsapp_webhook(request: Request):
+async def whatsapp_webhook(request: Request, background_tasks: BackgroundTasks):
     """
     Main WhatsApp webhook with OSD Persona Intelligence.
     
     Flow:
-    1. Receive message
+    1. Receive message and acknowledge Twilio immediately
     2. Detect language
     3. Classify intent (CHAT/GRIEVANCE/STATUS/FEEDBACK)
     4. Respond appropriately - DO NOT register chats as grievances
+    
+    Steps 2-4 run as a background task and reply through the Twilio REST API,
+    so slow media/LLM work never hits Twilio's 15s webhook timeout.
     """
     try:
         form_data = await request.form()
+        g = form_data.get
+        
+        from_number = g('From', '').replace('whatsapp:', '').strip()
+        message_body = g('Body', '').strip()
+        profile_name = g('ProfileName', 'Citizen')
         
-        from_number = form_data.get('From', '').replace('whatsapp:', '').strip()
-        message_body = form_data.get('Body', '').strip()
-        profile_name = form_data.get('ProfileName', 'Citizen')
+        if int(g('NumMedia') or 0) > 0:
+            media_url = g('MediaUrl0', '')
+            media_content_type = g('MediaContentType0', '')
+        else:
+            media_url = media_content_type = None
         
-        num_media = int(form_data.get('NumMedia', 0))
-        media_url = form_data.get('MediaUrl0', '') if num_media > 0 else None
-        media_content_type = form_data.get('MediaContentType0', '') if num_media > 0 else None
+        message_sid = g('MessageSid')
         
-        print(f"📱 WhatsApp from {from_number} ({profile_name}): {message_body[:100]}...")
+        logger.info("📱 WhatsApp from %s (%s): %.100s", from_number, profile_name, message_body)
         
-        response_message = await process_osd_conversation(
+        if message_sid in SEEN_MESSAGE_SIDS:
+            logger.info("🔁 Duplicate delivery of %s ignored", message_sid)
+            return Response(content=EMPTY_TWIML, media_type="application/xml")
+        if message_sid:
+            SEEN_MESSAGE_SIDS[message_sid] = True
+        
+        background_tasks.add_task(
+            reply_to_citizen,
             phone=from_number,
             message=message_body,
             name=profile_name,
@@ -131,20 +343,50 @@ async def whatsapp_webhook(request: Request):
             media_content_type=media_content_type
         )
         
-        resp = MessagingResponse()
-        resp.message(response_message)
-        
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=MEDIA_ACK_TWIML if media_url else EMPTY_TWIML, media_type="application/xml")
         
     except Exception as e:
-        print(f"❌ Webhook error: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        resp = MessagingResponse()
-        resp.message("I apologize for the inconvenience. Please try again in a moment.")
-        
-        return Response(content=str(resp), media_type="application/xml")
+        logger.exception("❌ Webhook error: %s", e)
+        return Response(content=WEBHOOK_ERROR_TWIML, media_type="application/xml")
+
+
+@asynccontextmanager
+async def sender_media_slot(phone: str):
+    """Hold one of the sender's media slots; the entry is dropped once nobody holds or awaits it"""
+    slot = _sender_media_slots.setdefault(phone, [asyncio.Semaphore(SENDER_MEDIA_CONCURRENCY), 0])
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if not slot[1]:
+            _sender_media_slots.pop(phone, None)
+
+
+async def reply_to_citizen(phone: str, message: str, name: str, media_url: str = None, media_content_type: str = None):
+    """Background half of the webhook: run the OSD pipeline and send its reply via Twilio"""
+    try:
+        conversation = process_osd_conversation(
+            phone=phone,
+            message=message,
+            name=name,
+            media_url=media_url,
+            media_content_type=media_content_type
+        )
+        if media_url:
+            async with sender_media_slot(phone):
+                response_message = await conversation
+        else:
+            response_message = await conversation
+    except Exception as e:
+        logger.exception("❌ Conversation processing error: %s", e)
+        response_message = WEBHOOK_ERROR_MESSAGE
+    
+    try:
+        await send_whatsapp_text(f'whatsapp:{phone}', response_message)
+    except Exception as e:
+        logger.exception("❌ Could not send reply to %s: %s", phone, e)
 
 
 async def process_osd_conversation(phone: str, message: str, name: str, media_url: str = None, media_content_type: str = None) -> str:
@@ -157,7 +399,13 @@ async def process_osd_conversation(phone: str, message: str, name: str, media_ur
     3. If STATUS: Fetch and respond in native language
     4. If GRIEVANCE: Extract, register, confirm in native language
     """
-    supabase = get_supabase()
+    # Fast path: bare greetings and "status" need neither the LLM nor media handling
+    if not media_url:
+        key = message.strip().casefold()
+        if key in GREETINGS:
+            return GREETING_TEMPLATE.format(name=name or "Citizen")
+        if key == 'status':
+            return await get_grievance_status_osd(phone, 'en', get_supabase())
     
     # ===========================================================================
     # STEP 1: HANDLE MEDIA (PDF/Image/Audio)
@@ -165,52 +413,54 @@ async def process_osd_conversation(phone: str, message: str, name: str, media_ur
     media_extracted = None
     
     if media_url and media_content_type:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            media_obj = await download_twilio_media(media_url, client)
+        media_kind = classify_media(media_content_type, media_url)
+        is_audio = media_kind == 'audio'
+        is_image = media_kind == 'image'
+        is_pdf = media_kind == 'pdf'
+        
+        if media_kind is None:
+            # Nothing to read from it (video, stickers, ...) - archive without buffering
+            await stream_media_to_storage(media_url, 'images')
+        
+        elif media_obj := await download_twilio_media(media_url):
+            folder = 'audio' if is_audio else ('documents' if is_pdf else 'images')
             
-            if media_obj:
-                is_audio = 'audio' in media_content_type.lower() or 'ogg' in media_url.lower()
-                is_image = 'image' in media_content_type.lower()
-                is_pdf = 'pdf' in media_content_type.lower()
-                
-                # Upload to storage
-                try:
-                    folder = 'audio' if is_audio else ('documents' if is_pdf else 'images')
-                    stored_url = await upload_to_storage(media_obj, folder, client)
-                except Exception as e:
-                    print(f"⚠️ Storage upload failed: {e}")
-                    stored_url = None
+            if is_image or is_pdf:
+                # The storage URL is known before the upload finishes, so read the document meanwhile
+                media_extracted, stored_url = await asyncio.gather(
+                    extract_grievance_from_media(media_obj['buffer'], media_content_type),
+                    store_media(media_obj, folder)
+                )
                 
-                if is_audio:
-                    # Transcribe voice message with detailed logging
-                    print(f"🎤 Processing voice message: {len(media_obj['buffer'])} bytes, type: {media_content_type}")
-                    transcript = await transcribe_audio(media_obj['buffer'], media_content_type)
-                    if transcript and len(transcript.strip()) > 0:
-                        message = transcript
-                        print(f"✅ Voice transcribed successfully: {transcript[:100]}...")
-                    else:
-                        print(f"❌ Voice transcription returned empty result")
-                        # Detect language from any text message context
-                        user_lang = detect_language(message) if message else 'en'
-                        if user_lang == 'en':
-                            return "Sorry, I could not understand your voice message. Please try again or type your message."
-                        else:
-                            return "Maaf kijiye, aapka voice message samajh nahi aaya. Kripya dobara bhejein ya text mein likhein."
-                
-                elif is_image or is_pdf:
-                    # Extract grievance from document
-                    media_extracted = await extract_grievance_from_media(media_obj['buffer'], media_content_type)
-                    
-                    if media_extracted:
-                        media_extracted['media_url'] = stored_url
-                        print(f"📎 Extracted from media: {media_extracted}")
-                    else:
-                        return await get_osd_response("media_error", detect_language(message) or 'en')
+                if media_extracted:
+                    media_extracted['media_url'] = stored_url
+                    logger.debug("📎 Extracted from media: %s", media_extracted)
+                else:
+                    return await get_osd_response("media_error", detect_language(message) or 'en')
+            
+            else:
+                # Transcribe voice message with detailed logging; archiving runs alongside
+                # (both swallow their own failures, so neither can sink the other)
+                logger.debug("🎤 Processing voice message: %d bytes, type: %s", len(media_obj['buffer']), media_content_type)
+                transcript, _ = await asyncio.gather(
+                    transcribe_audio(media_obj['buffer'], media_content_type),
+                    store_media(media_obj, folder)
+                )
+                if transcript and len(transcript.strip()) > 0:
+                    message = transcript
+                    logger.debug("✅ Voice transcribed successfully: %.100s", transcript)
+                else:
+                    logger.warning("❌ Voice transcription returned empty result")
+                    # Detect language from any text message context
+                    user_lang = detect_language(message) if message else 'en'
+                    return VOICE_UNCLEAR_REPLIES['en' if user_lang == 'en' else 'other']
     
     # ===========================================================================
     # STEP 2: OSD BRAIN - INTENT CLASSIFICATION
     # ===========================================================================
     
+    supabase = get_supabase()
+    
     # If we have media-extracted data, it's definitely a grievance
     if media_extracted and media_extracted.get('description'):
         return await register_grievance_osd(
@@ -226,14 +476,24 @@ async def process_osd_conversation(phone: str, message: str, name: str, media_ur
     
     # For text messages - use the OSD Brain
     if message:
-        ai_decision = await analyze_incoming_message(message, name, phone)
+        # Warm the politician id cache while the LLM classifies the message;
+        # a failed prefetch only matters to the grievance path, which looks it up again
+        ai_decision, prefetch = await asyncio.gather(
+            analyze_incoming_message(message, name, phone),
+            get_default_politician_id(supabase),
+            return_exceptions=True
+        )
+        if isinstance(ai_decision, BaseException):
+            raise ai_decision
+        if isinstance(prefetch, Exception):
+            logger.warning("⚠️ Politician id prefetch failed: %s", prefetch)
         
-        intent = ai_decision.get('intent', 'CHAT')
-        user_lang = ai_decision.get('detected_language', 'en')
-        ai_reply = ai_decision.get('reply')
-        grievance_data = ai_decision.get('grievance_data')
+        intent = ai_decision.intent
+        user_lang = ai_decision.detected_language or 'en'
+        ai_reply = ai_decision.reply
+        grievance_data = ai_decision.grievance_data
         
-        print(f"🧠 OSD Brain Decision: intent={intent}, lang={user_lang}")
+        logger.info("🧠 OSD Brain Decision: intent=%s, lang=%s", intent, user_lang)
         
         # ---------------------------------------------------------------------
         # CHAT: Greetings, Thank you, OK, General conversation
@@ -288,6 +548,93 @@ async def process_osd_conversation(phone: str, message: str, name: str, media_ur
     return await get_osd_response("clarification", 'en')
 
 
+# ==============================================================================
+# BATCHED GRIEVANCE INSERTS
+# ==============================================================================
+# One worker drains whatever registrations queued up while the previous insert
+# was in flight and writes them in a single PostgREST call. An idle bot inserts
+# immediately; a burst costs one round-trip per batch instead of per grievance.
+
+GRIEVANCE_INSERT_BATCH_SIZE = 50
+# Registrations waiting on the worker; beyond this, callers block on put() (backpressure)
+GRIEVANCE_INSERT_QUEUE_SIZE = 1000
+
+_grievance_insert_queue: Optional[asyncio.Queue] = None
+_grievance_insert_worker: Optional[asyncio.Task] = None
+
+
+async def insert_grievance(row: dict) -> dict:
+    """Queue a grievance row for the next batch and wait for the stored record"""
+    global _grievance_insert_queue, _grievance_insert_worker
+    if _grievance_insert_worker is None or _grievance_insert_worker.done():
+        _grievance_insert_queue = asyncio.Queue(maxsize=GRIEVANCE_INSERT_QUEUE_SIZE)
+        _grievance_insert_worker = asyncio.create_task(flush_grievance_inserts(_grievance_insert_queue))
+    
+    future = asyncio.get_running_loop().create_future()
+    await _grievance_insert_queue.put((row, future))
+    return await future
+
+
+async def flush_grievance_inserts(queue: asyncio.Queue):
+    """Worker loop: insert queued grievances in batches of up to GRIEVANCE_INSERT_BATCH_SIZE"""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < GRIEVANCE_INSERT_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        
+        try:
+            await insert_grievance_batch(batch)
+        except Exception as e:
+            # insert_grievance_batch settles every future it got to; only fail the rest
+            pending = [future for _, future in batch if not future.done()]
+            logger.error("❌ Grievance insert failed for %d of %d queued rows: %s", len(pending), len(batch), e)
+            for future in pending:
+                future.set_exception(e)
+
+
+async def insert_grievance_batch(batch: list):
+    """Insert a batch in one call; if PostgREST rejects it, retry row by row so one bad row can't sink the rest"""
+    supabase = get_supabase()
+    rows = [row for row, _ in batch]
+    
+    try:
+        result = await asyncio.to_thread(lambda: supabase.table('grievances').insert(rows).execute())
+        stored_rows = result.data or []
+    except Exception as e:
+        if len(batch) == 1:
+            raise
+        logger.warning("⚠️ Batch insert of %d grievances failed (%s), inserting individually", len(batch), e)
+        for item in batch:
+            try:
+                await insert_grievance_batch([item])
+            except Exception as row_error:
+                if not item[1].done():
+                    item[1].set_exception(row_error)
+        return
+    
+    # PostgREST returns inserted rows in request order. A caller may have been
+    # cancelled meanwhile; its future is already done and must not be settled again.
+    for (_, future), stored in zip(batch, stored_rows):
+        if not future.done():
+            future.set_result(stored)
+    for _, future in batch[len(stored_rows):]:
+        if not future.done():
+            future.set_result(None)
+
+
+async def close_grievance_insert_worker():
+    """Stop the batch insert worker (called from the app lifespan on shutdown)"""
+    global _grievance_insert_queue, _grievance_insert_worker
+    if _grievance_insert_worker is not None and not _grievance_insert_worker.done():
+        _grievance_insert_worker.cancel()
+        try:
+            await _grievance_insert_worker
+        except asyncio.CancelledError:
+            pass
+    _grievance_insert_queue = None
+    _grievance_insert_worker = None
+
+
 # ==============================================================================
 # GRIEVANCE REGISTRATION
 # ==============================================================================
@@ -301,27 +648,24 @@ async def register_grievance_osd(phone: str, name: str, area: str, category: str
     """
     
     # Validate language code - only allow known Indian languages
-    VALID_LANGUAGES = ['en', 'hi', 'hinglish', 'te', 'tenglish', 'ta', 'kn', 'ml', 'bn', 'mr', 'gu', 'pa']
     if language not in VALID_LANGUAGES:
-        print(f"⚠️ [Registration] Unknown language '{language}', defaulting to English")
+        logger.warning("⚠️ [Registration] Unknown language '%s', defaulting to English", language)
         language = 'en'
     
     # Get politician ID
-    politicians = supabase.table('politicians').select('id').limit(1).execute()
-    if not politicians.data:
+    politician_id = await get_default_politician_id(supabase)
+    if not politician_id:
         return "System error. Please contact the office directly."
     
-    politician_id = politicians.data[0]['id']
-    
     # Determine priority
     _, priority_level, deadline_hours = categorize_text(description)
     
     now = datetime.now(timezone.utc)
-    deadline = (now + timedelta(hours=deadline_hours)).isoformat()
+    deadline = (now + timedelta(hours=deadline_hours)).isoformat(timespec='seconds')
     
     # Grievance record - ALL IN ENGLISH for DB
     grievance_data = {
-        'id': str(uuid.uuid4()),
+        'id': str(uuid4()),
         'politician_id': politician_id,
         'citizen_name': name or "Citizen",
         'citizen_phone': phone,
@@ -335,46 +679,45 @@ async def register_grievance_osd(phone: str, name: str, area: str, category: str
         'raw_input_language': language,  # Store user's language for future notifications
         'media_url': media_url,
         'language_preference': language,
-        'created_at': now.isoformat()
+        'created_at': now.isoformat(timespec='milliseconds')
     }
     
+    # The ticket number comes from our own UUID, so the confirmation can be
+    # translated while the row is being inserted
+    ticket_id = grievance_data['id'][:8].upper()
+    
+    # Use the CTO-approved warm confirmation message
+    base_msg = get_grievance_confirmation_message(
+        ticket_id=ticket_id,
+        category=category,
+        description=description
+    )
+    
     try:
-        result = supabase.table('grievances').insert(grievance_data).execute()
-        
-        if result.data:
-            ticket_id = str(result.data[0]['id'])[:8].upper()
-            
-            # Use the CTO-approved warm confirmation message
-            base_msg = get_grievance_confirmation_message(
-                ticket_id=ticket_id,
-                category=category,
-                description=description
+        # Translate if language is a KNOWN Indian language (not 'en')
+        if language != 'en':
+            stored, response = await asyncio.gather(
+                insert_grievance(grievance_data),
+                translate_text(base_msg, language)
             )
             
-            # Translate if language is a KNOWN Indian language (not 'en')
-            if language in ['hi', 'hinglish', 'te', 'tenglish', 'ta', 'kn', 'ml', 'bn', 'mr', 'gu', 'pa']:
-                response = await translate_text(base_msg, language)
-                
-                # SAFETY CHECK: If response contains foreign language, use English
-                foreign_markers = ['constatat', 'nemulțumirea', 'înregistrat', 'dumneavoastră', 
-                                  'je suis', 'nous', 'vous', 'merci', 'bonjour', 
-                                  'gracias', 'hola', 'danke', 'bitte']
-                response_lower = response.lower()
-                
-                for marker in foreign_markers:
-                    if marker in response_lower:
-                        print(f"⚠️ [Registration] Foreign language detected in response! Using English.")
-                        response = base_msg
-                        break
-            else:
-                response = base_msg
+            # SAFETY CHECK: If response contains foreign language, use English
+            response_lower = response.lower()
             
+            for marker in FOREIGN_MARKERS:
+                if marker in response_lower:
+                    logger.warning("⚠️ [Registration] Foreign language detected in response! Using English.")
+                    response = base_msg
+                    break
+        else:
+            stored = await insert_grievance(grievance_data)
+            response = base_msg
+        
+        if stored:
             return response
             
     except Exception as e:
-        print(f"❌ Registration error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Registration error: %s", e)
     
     return "I apologize, there was an error registering your grievance. Please try again."
 
@@ -386,7 +729,9 @@ async def register_grievance_osd(phone: str, name: str, area: str, category: str
 async def get_grievance_status_osd(phone: str, language: str, supabase) -> str:
     """Get grievance status in user's native language"""
     try:
-        result = supabase.table('grievances').select('*').eq('citizen_phone', phone).order('created_at', desc=True).limit(5).execute()
+        result = await asyncio.to_thread(
+            lambda: supabase.table('grievances').select(STATUS_COLUMNS).eq('citizen_phone', phone).order('created_at', desc=True).limit(5).execute()
+        )
         
         if not result.data:
             no_grievance_msg = "I could not find any grievances registered with your phone number."
@@ -394,30 +739,30 @@ async def get_grievance_status_osd(phone: str, language: str, supabase) -> str:
                 return await translate_text(no_grievance_msg, language)
             return no_grievance_msg
         
-        status_emojis = {'PENDING': '⏳', 'IN_PROGRESS': '🔄', 'RESOLVED': '✅', 'ASSIGNED': '👤'}
-        
         header = "Here are your recent grievances:"
         if language != 'en':
             header = await translate_text(header, language)
         
-        status_text = f"📊 {header}\n\n"
+        parts = [f"📊 {header}\n\n"]
         
         for idx, g in enumerate(result.data, 1):
             status = (g.get('status') or 'PENDING').upper()
-            emoji = status_emojis.get(status, '📝')
+            emoji = STATUS_EMOJIS.get(status, '📝')
             created = g.get('created_at', '')[:10]
             category = g.get('category', 'Miscellaneous')
             ticket_id = str(g.get('id', ''))[:8].upper()
             
-            status_text += f"{idx}. {emoji} #{ticket_id}\n"
-            status_text += f"   📁 {category}\n"
-            status_text += f"   📅 {created}\n"
-            status_text += f"   Status: {status}\n\n"
+            parts.append(
+                f"{idx}. {emoji} #{ticket_id}\n"
+                f"   📁 {category}\n"
+                f"   📅 {created}\n"
+                f"   Status: {status}\n\n"
+            )
         
-        return status_text
+        return "".join(parts)
         
     except Exception as e:
-        print(f"❌ Status fetch error: {e}")
+        logger.error("❌ Status fetch error: %s", e)
         return "Error fetching status. Please try again."
 
 
@@ -427,23 +772,14 @@ async def get_grievance_status_osd(phone: str, language: str, supabase) -> str:
 
 def extract_rating(text: str) -> int:
     """Extract rating (1-5) from text"""
-    import re
     # Look for numbers 1-5
-    match = re.search(r'\b([1-5])\b', text)
+    match = RATING_RE.search(text)
     if match:
         return int(match.group(1))
     
     # Check for words
-    rating_words = {
-        'excellent': 5, 'great': 5, 'amazing': 5, 'perfect': 5,
-        'good': 4, 'satisfied': 4, 'happy': 4,
-        'okay': 3, 'ok': 3, 'average': 3,
-        'bad': 2, 'poor': 2, 'unsatisfied': 2,
-        'terrible': 1, 'worst': 1, 'horrible': 1
-    }
-    
     text_lower = text.lower()
-    for word, rating in rating_words.items():
+    for word, rating in RATING_WORDS.items():
         if word in text_lower:
             return rating
     
@@ -453,14 +789,18 @@ def extract_rating(text: str) -> int:
 async def update_latest_grievance_rating(phone: str, rating: int, supabase):
     """Update the most recent resolved grievance with feedback rating"""
     try:
-        result = supabase.table('grievances').select('id').eq('citizen_phone', phone).eq('status', 'RESOLVED').order('created_at', desc=True).limit(1).execute()
+        result = await asyncio.to_thread(
+            lambda: supabase.table('grievances').select('id').eq('citizen_phone', phone).eq('status', 'RESOLVED').order('created_at', desc=True).limit(1).execute()
+        )
         
         if result.data:
             grievance_id = result.data[0]['id']
-            supabase.table('grievances').update({'feedback_rating': rating}).eq('id', grievance_id).execute()
-            print(f"✅ Updated rating to {rating} for grievance {grievance_id}")
+            await asyncio.to_thread(
+                lambda: supabase.table('grievances').update({'feedback_rating': rating}).eq('id', grievance_id).execute()
+            )
+            logger.info("✅ Updated rating to %d for grievance %s", rating, grievance_id)
     except Exception as e:
-        print(f"⚠️ Could not update rating: {e}")
+        logger.warning("⚠️ Could not update rating: %s", e)
 
 
 async def get_osd_response(response_type: str, language: str, name: str = None, **kwargs) -> str:
@@ -469,39 +809,10 @@ async def get_osd_response(response_type: str, language: str, name: str = None,
     
     CTO-approved message templates for professional yet empathetic communication.
     """
-    from routes.ai_routes import translate_text
-    
-    # Citizen-friendly message templates
-    responses = {
-        # Warm greeting message
-        "greeting": f"""Namaste{', ' + name if name else ''}.
-Thank you for reaching out to the Office of the Leader. We truly appreciate you taking the time to connect with us.
-
-We are here to support you. You may share your query or register a grievance, and our team will carefully look into the matter and assist you as soon as possible.""",
-        
-        # Chat/general response
-        "chat_default": "I'm here to assist you. How may I help you today?",
-        
-        # Query assistance
-        "query_default": "I'd be happy to help with information. Could you please specify which scheme or process you'd like to know about?",
-        
-        # Feedback thanks
-        "feedback_thanks": "Thank you for your valuable feedback. We are committed to serving you better.",
-        
-        # Voice error
-        "voice_error": "I received your voice message but could not process it clearly. Please try again or type your message.",
-        
-        # Media error
-        "media_error": "I received your document but could not extract the information. Please describe your issue in text.",
-        
-        # Clarification needed
-        "clarification": "I'm here to help. Could you please provide more details about your concern?",
-        
-        # Status check - no grievance found
-        "no_grievance": "I could not find any recent grievance registered with your number. Would you like to register a new one?",
-    }
-    
-    base_msg = responses.get(response_type, responses["chat_default"])
+    if response_type == "greeting":
+        base_msg = GREETING_TEMPLATE.format(name=name) if name else ANONYMOUS_GREETING
+    else:
+        base_msg = OSD_RESPONSES.get(response_type, OSD_RESPONSES["chat_default"])
     
     # Translate to user's language if not English
     if language and language != 'en':
@@ -515,10 +826,11 @@ def get_grievance_confirmation_message(ticket_id: str, category: str, descriptio
     Generate the grievance registration confirmation message.
     This is the CTO-approved warm, reassuring template.
     """
+    summary = description if len(description) <= 100 else f"{description[:100]}..."
     return f"""Your grievance has been successfully registered. Please find the details below:
 
 📋 Issue Category: {category}
-📝 Issue Type: {description[:100]}{'...' if len(description) > 100 else ''}
+📝 Issue Type: {summary}
 🎫 Ticket Number: #{ticket_id}
 
 Thank you for bringing this to our attention. We understand that your concern is important, and our team will review it with care.
@@ -536,7 +848,9 @@ async def send_resolution_notification(grievance_id: str, supabase) -> bool:
     Called when OSD marks grievance as resolved.
     """
     try:
-        result = supabase.table('grievances').select('*').eq('id', grievance_id).execute()
+        result = await asyncio.to_thread(
+            lambda: supabase.table('grievances').select('citizen_phone,raw_input_language,language_preference,category').eq('id', grievance_id).execute()
+        )
         
         if not result.data:
             return False
@@ -563,15 +877,13 @@ async def send_resolution_notification(grievance_id: str, supabase) -> bool:
         
         # Send via Twilio
         to_number = f'whatsapp:{citizen_phone}' if not citizen_phone.startswith('whatsapp:') else citizen_phone
-        twilio_client.messages.create(from_=TWILIO_WHATSAPP_NUMBER, body=final_msg, to=to_number)
+        await send_whatsapp_text(to_number, final_msg)
         
-        print(f"📤 Resolution notification sent to {citizen_phone} in {user_lang}")
+        logger.info("📤 Resolution notification sent to %s in %s", citizen_phone, user_lang)
         return True
         
     except Exception as e:
-        print(f"❌ Resolution notification error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Resolution notification error: %s", e)
         return False
 
 
@@ -588,7 +900,7 @@ async def send_whatsapp_message(data: WhatsAppMessage):
     """Send WhatsApp message"""
     try:
         to_number = data.to if data.to.startswith('whatsapp:') else f'whatsapp:{data.to}'
-        message = twilio_client.messages.create(from_=TWILIO_WHATSAPP_NUMBER, body=data.message, to=to_number)
+        message = await send_whatsapp_text(to_number, data.message)
         return {"success": True, "message_sid": message.sid}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -129,12 +129,18 @@ def seed_data():
         }
     ]
     
-    for user in users_data:
-        try:
-            supabase.table('users').insert(user).execute()
+    # Skip users that already exist (reruns), then read back the ids actually stored
+    # so the grievances and posts below reference real rows
+    try:
+        created = supabase.table('users').upsert(users_data, on_conflict='email', ignore_duplicates=True).execute()
+        for user in created.data or []:
             print(f"✅ Created user: {user['email']} ({user['role']})")
-        except Exception as e:
-            print(f"⚠️  User may already exist: {user['email']}")
+        stored = supabase.table('users').select('id,email').in_('email', [u['email'] for u in users_data]).execute()
+        user_ids = {u['email']: u['id'] for u in stored.data}
+        for user in users_data:
+            user['id'] = user_ids.get(user['email'], user['id'])
+    except Exception as e:
+        print(f"⚠️  Could not create users: {e}")
     
     # Create sample grievances
     sample_grievances = [
@@ -173,12 +179,12 @@ def seed_data():
         }
     ]
     
-    for grievance in sample_grievances:
-        try:
-            supabase.table('grievances').insert(grievance).execute()
+    try:
+        supabase.table('grievances').insert(sample_grievances).execute()
+        for grievance in sample_grievances:
             print(f"✅ Created grievance from: {grievance['constituent_name']}")
-        except Exception as e:
-            print(f"⚠️  Grievance may already exist")
+    except Exception as e:
+        print(f"⚠️  Could not create grievances: {e}")
     
     # Create sample posts
     sample_posts = [
@@ -201,12 +207,12 @@ def seed_data():
         }
     ]
     
-    for post in sample_posts:
-        try:
-            supabase.table('posts').insert(post).execute()
+    try:
+        supabase.table('posts').insert(sample_posts).execute()
+        for post in sample_posts:
             print(f"✅ Created post with status: {post['status']}")
-        except Exception as e:
-            print(f"⚠️  Post may already exist")
+    except Exception as e:
+        print(f"⚠️  Could not create posts: {e}")
     
     # Create sample sentiment data
     sample_sentiment = [
@@ -228,12 +234,12 @@ def seed_data():
         }
     ]
     
-    for sentiment in sample_sentiment:
-        try:
-            supabase.table('sentiment_analytics').insert(sentiment).execute()
+    try:
+        supabase.table('sentiment_analytics').insert(sample_sentiment).execute()
+        for sentiment in sample_sentiment:
             print(f"✅ Created sentiment entry for: {sentiment['issue_category']}")
-        except Exception as e:
-            print(f"⚠️  Sentiment may already exist")
+    except Exception as e:
+        print(f"⚠️  Could not create sentiment entries: {e}")
     
     print("\n✨ Seeding complete!")
     print("\n📝 Demo credentials:")
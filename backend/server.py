@@ -1,4 +1,5 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
@@ -6,18 +7,19 @@ import logging
 import subprocess
 import sys
 from pathlib import Path
+from datetime import datetime
 from contextlib import asynccontextmanager
 
 # APScheduler for Background Tasks
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from services.social_listener import fetch_and_analyze_social_feed
+from http_client import close_http_clients
+from database import close_supabase_async
 
 # TextBlob Corpora Download (for Sentiment Engine)
-try:
-    from textblob import TextBlob
-    # Simple test to verify model availability
-    TextBlob("test").sentiment
-except Exception:
+# Provision the corpora once at build time (`python -m textblob.download_corpora`);
+# set DOWNLOAD_CORPORA_ON_BOOT=1 on dev boxes to fetch them here instead.
+if os.getenv("DOWNLOAD_CORPORA_ON_BOOT"):
     print("Installing TextBlob Corpora for Sentiment Engine...")
     try:
         subprocess.check_call([sys.executable, "-m", "textblob.download_corpora"])
@@ -37,22 +39,22 @@ async def lifespan(app: FastAPI):
     # --- STARTUP ---
     print("🚀 System Starting... Initializing Social Listener.")
     
-    # Schedule the Social Listener to run every 5 minutes
-    scheduler.add_job(fetch_and_analyze_social_feed, 'interval', minutes=5)
+    # Schedule the Social Listener to run every 5 minutes, plus once right away to
+    # populate initial data. The first run happens on the scheduler, not here, so the
+    # app starts serving immediately; failures are logged by APScheduler.
+    scheduler.add_job(fetch_and_analyze_social_feed, 'interval', minutes=5, next_run_time=datetime.now())
     scheduler.start()
     
-    # Run once immediately on startup to populate initial data
-    try:
-        await fetch_and_analyze_social_feed()
-    except Exception as e:
-        print(f"⚠️ Initial Social Listener run failed: {e}")
-    
     yield
     # --- SHUTDOWN ---
     print("🛑 System Shutting Down...")
     scheduler.shutdown()
+    await whatsapp_routes.close_grievance_insert_worker()
+    await close_http_clients()
+    await close_supabase_async()
 
-app = FastAPI(title="YOU - Governance ERP", version="1.0.0", lifespan=lifespan)
+# orjson encodes every router's JSON responses (dashboards return hundreds of rows)
+app = FastAPI(title="YOU - Governance ERP", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # CORS middleware must be added BEFORE including routers
 app.add_middleware(
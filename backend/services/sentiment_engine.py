@@ -4,7 +4,16 @@ LLM-based contextual sentiment analysis for social media comments
 Handles native Indian languages (Telugu, Hindi, Tamil) with political context
 """
 import os
-import json
+import re
+import orjson
+import hashlib
+from bisect import bisect_right
+from functools import lru_cache
+import pandas as pd
+from typing import Literal, Optional
+from textblob.sentiments import PatternAnalyzer
+from pydantic import BaseModel, field_validator
+from cachetools import TTLCache
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
@@ -40,6 +49,98 @@ You are a Political Sentiment Analyst for an Indian MLA/MP. Analyze social media
 }
 """
 
+# Same analyst, several posts per request: one round-trip and one copy of the instructions
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+**BATCH MODE:**
+Input is {"posts": [{"id": ..., "context": ..., "comments": [...], "reactions": {...}}, ...]}.
+Analyze each post against its OWN context and return ONLY:
+{"results": [{"id": <post id>, "positive_count": ..., "neutral_count": ..., "negative_count": ..., "overall_sentiment": ..., "narrative_summary": ...}, ...]}
+"""
+
+# Comments per post sent to the LLM (cost control)
+MAX_COMMENTS_PER_POST = 50
+
+# LLM verdicts per post content; a dashboard refresh or retry within the hour reuses them.
+# The key covers the comments and reactions, so new activity on a post is a fresh miss.
+SENTIMENT_CACHE_TTL_SECONDS = 3600
+SENTIMENT_CACHE = TTLCache(maxsize=1024, ttl=SENTIMENT_CACHE_TTL_SECONDS)
+
+EMPTY_SENTIMENT = {
+    "positive_count": 0,
+    "neutral_count": 0,
+    "negative_count": 0,
+    "overall_sentiment": "Neutral",
+    "narrative_summary": "No data available for analysis."
+}
+
+
+class SentimentResult(BaseModel):
+    """Sentiment report decoded straight from the LLM's JSON; omitted fields get safe defaults"""
+    positive_count: int = 0
+    neutral_count: int = 0
+    negative_count: int = 0
+    overall_sentiment: Literal["Positive", "Neutral", "Negative"] = "Neutral"
+    narrative_summary: str = "Analysis complete."
+    
+    @field_validator("overall_sentiment", mode="before")
+    @classmethod
+    def _title_case(cls, value):
+        # The model sometimes answers "positive" / "NEGATIVE"
+        return value.strip().title() if isinstance(value, str) else value
+
+
+# TextBlob's default lexicon analyzer, built once and called directly:
+# polarity is a word-score lookup and needs none of the TextBlob wrapper setup
+SENTIMENT_ANALYZER = PatternAnalyzer()
+
+# |polarity| above this counts as positive/negative, otherwise neutral
+POLARITY_THRESHOLD = 0.1
+
+# English comments the lexicon scores more strongly than this skip the LLM
+CONFIDENT_POLARITY = 0.5
+
+
+@lru_cache(maxsize=4096)
+def comment_polarity(text: str) -> float:
+    """Polarity of one comment; repeated comments are scored once"""
+    return SENTIMENT_ANALYZER.analyze(text).polarity
+
+
+def classify_comments_locally(post_context: str, comments_list: list, reactions_dict: dict) -> Optional[dict]:
+    """
+    Skip the LLM when it can't add anything: every comment is plain English and
+    clearly positive or negative to the lexicon. Returns None when the LLM is needed
+    (Telugu/Hindi/code-mixed text, or any borderline comment such as sarcasm bait).
+    """
+    if not all(comment.isascii() for comment in comments_list):
+        return None
+    scores = [comment_polarity(comment) for comment in comments_list]
+    if not all(abs(score) > CONFIDENT_POLARITY for score in scores):
+        return None
+    
+    positive = sum(score > 0 for score in scores)
+    negative = len(scores) - positive
+    comment_result = {
+        "positive_count": positive,
+        "neutral_count": 0,
+        "negative_count": negative,
+        "overall_sentiment": "Neutral",
+        "narrative_summary": f"{len(scores)} clear-cut comments: {positive} positive, {negative} negative."
+    }
+    return merge_sentiment_results([comment_result, analyze_reactions_only(reactions_dict, post_context)])
+
+
+def sentiment_cache_key(post_context: str, comments_list: list, reactions_dict: dict) -> str:
+    """Digest of everything the LLM sees for one post"""
+    payload = orjson.dumps([post_context, comments_list, sorted((reactions_dict or {}).items())])
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def strip_json_fence(response: str) -> str:
+    """Gemini wraps its JSON in a ```json fence; trim it without rescanning the body"""
+    return response.strip().removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+
+
 async def analyze_social_sentiment(post_context: str, comments_list: list, reactions_dict: dict) -> dict:
     """
     Analyze social media sentiment using LLM with political context awareness.
@@ -55,18 +156,23 @@ async def analyze_social_sentiment(post_context: str, comments_list: list, react
     try:
         # If no data, return empty result
         if not comments_list and not reactions_dict:
-            return {
-                "positive_count": 0,
-                "neutral_count": 0,
-                "negative_count": 0,
-                "overall_sentiment": "Neutral",
-                "narrative_summary": "No data available for analysis."
-            }
+            return dict(EMPTY_SENTIMENT)
         
         # Quick analysis for reaction-only posts (no comments)
         if not comments_list and reactions_dict:
             return analyze_reactions_only(reactions_dict, post_context)
         
+        # Clear-cut English comments don't need the LLM
+        comments_list = comments_list[:MAX_COMMENTS_PER_POST]
+        local_result = classify_comments_locally(post_context, comments_list, reactions_dict)
+        if local_result is not None:
+            return local_result
+        
+        cache_key = sentiment_cache_key(post_context, comments_list, reactions_dict)
+        cached = SENTIMENT_CACHE.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         # LLM-based analysis for posts with comments
         chat = LlmChat(
             api_key=EMERGENT_LLM_KEY,
@@ -77,24 +183,17 @@ async def analyze_social_sentiment(post_context: str, comments_list: list, react
         # Prepare input for LLM
         input_data = {
             "context": post_context or "General political post",
-            "comments": comments_list[:50],  # Limit to 50 comments for cost efficiency
+            "comments": comments_list,  # Limited above for cost efficiency
             "reactions": reactions_dict
         }
         
-        user_message = UserMessage(text=json.dumps(input_data, ensure_ascii=False))
+        user_message = UserMessage(text=orjson.dumps(input_data).decode())
         response = await chat.send_message(user_message)
         
-        # Parse JSON response
-        clean_response = response.replace('```json', '').replace('```', '').strip()
-        result = json.loads(clean_response)
-        
-        return {
-            "positive_count": result.get("positive_count", 0),
-            "neutral_count": result.get("neutral_count", 0),
-            "negative_count": result.get("negative_count", 0),
-            "overall_sentiment": result.get("overall_sentiment", "Neutral"),
-            "narrative_summary": result.get("narrative_summary", "Analysis complete.")
-        }
+        # Parse and validate in one pass; only real LLM verdicts are cached
+        result = SentimentResult.model_validate_json(strip_json_fence(response)).model_dump()
+        SENTIMENT_CACHE[cache_key] = result
+        return dict(result)
         
     except Exception as e:
         print(f"❌ Sentiment Analysis Error: {e}")
@@ -102,19 +201,141 @@ async def analyze_social_sentiment(post_context: str, comments_list: list, react
         return analyze_reactions_only(reactions_dict, post_context)
 
 
+async def analyze_social_sentiment_batch(items: list) -> list:
+    """
+    Analyze several posts in ONE LLM call, each against its own context.
+    
+    Args:
+        items: List of (post_context, comments_list, reactions_dict) tuples
+    
+    Returns:
+        One sentiment result per item, in input order. Posts without comments
+        (or missing from the LLM reply) use the reaction-based rules; clear-cut
+        English comment threads are classified locally.
+    """
+    results = [
+        dict(EMPTY_SENTIMENT) if not comments and not reactions else analyze_reactions_only(reactions, context)
+        for context, comments, reactions in items
+    ]
+    
+    # Only posts the lexicon can't settle (and not analyzed recently) go to the LLM
+    posts = []
+    cache_keys = {}
+    for idx, (context, comments, reactions) in enumerate(items):
+        if not comments:
+            continue
+        comments = comments[:MAX_COMMENTS_PER_POST]
+        local_result = classify_comments_locally(context, comments, reactions)
+        if local_result is not None:
+            results[idx] = local_result
+            continue
+        cache_key = sentiment_cache_key(context, comments, reactions)
+        cached = SENTIMENT_CACHE.get(cache_key)
+        if cached is not None:
+            results[idx] = dict(cached)
+            continue
+        cache_keys[idx] = cache_key
+        posts.append({
+            "id": idx,
+            "context": context or "General political post",
+            "comments": comments,
+            "reactions": reactions
+        })
+    if not posts:
+        return results
+    
+    try:
+        chat = LlmChat(
+            api_key=EMERGENT_LLM_KEY,
+            session_id="sentiment-analysis",
+            system_message=BATCH_SYSTEM_PROMPT
+        ).with_model("openai", "gpt-4o-mini")
+        
+        response = await chat.send_message(UserMessage(text=orjson.dumps({"posts": posts}).decode()))
+        
+        # Validate per post so one malformed entry only drops that post back to reactions
+        for result in orjson.loads(strip_json_fence(response)).get("results", []):
+            idx = result.get("id")
+            if isinstance(idx, int) and idx in cache_keys:
+                try:
+                    results[idx] = SentimentResult.model_validate(result).model_dump()
+                    SENTIMENT_CACHE[cache_keys[idx]] = dict(results[idx])
+                except ValueError as e:
+                    print(f"⚠️ Invalid sentiment result for post {idx}: {e}")
+    except Exception as e:
+        print(f"❌ Batch Sentiment Analysis Error: {e}")
+    
+    return results
+
+
+def merge_sentiment_results(results: list) -> dict:
+    """Roll per-post results up into one report, using the reaction-rule thresholds"""
+    positive = sum(r["positive_count"] for r in results)
+    neutral = sum(r["neutral_count"] for r in results)
+    negative = sum(r["negative_count"] for r in results)
+    
+    if positive > (negative + neutral):
+        overall = "Positive"
+    elif negative > positive:
+        overall = "Negative"
+    else:
+        overall = "Neutral"
+    
+    # Narrative from the post that drew the most responses
+    busiest = max(results, key=lambda r: r["positive_count"] + r["neutral_count"] + r["negative_count"], default=EMPTY_SENTIMENT)
+    
+    return {
+        "positive_count": positive,
+        "neutral_count": neutral,
+        "negative_count": negative,
+        "overall_sentiment": overall,
+        "narrative_summary": busiest["narrative_summary"]
+    }
+
+
+# Post-context cues for the reaction rules (any case)
+CONDOLENCE_WORDS = ('condolence', 'death', 'passed away', 'rip', 'నివాళి', 'శోకం', 'श्रद्धांजलि')
+OPPOSITION_WORDS = ('opposition', 'tdp', 'bjp', 'congress', 'criticism', 'విమర్శ', 'आलोचना', 'expose')
+
+
+def _context_cue_re(words: tuple) -> re.Pattern:
+    """
+    One alternation per cue list. English cues must start a word ("rip" no longer
+    fires on "trip"; "condolences"/"exposed" still match); Telugu/Hindi cues stay
+    plain substrings since word boundaries don't line up with Indic vowel signs.
+    """
+    return re.compile(
+        "|".join(rf"\b{re.escape(w)}" if w.isascii() else re.escape(w) for w in words),
+        re.IGNORECASE
+    )
+
+
+CONDOLENCE_RE = _context_cue_re(CONDOLENCE_WORDS)
+OPPOSITION_RE = _context_cue_re(OPPOSITION_WORDS)
+
+
+REACTION_TYPES = ('like', 'love', 'haha', 'wow', 'sad', 'angry')
+
+# Reaction weights (positive, neutral, negative rows over REACTION_TYPES), baked per
+# context class keyed by (is_condolence, is_opposition_attack):
+# - SAD on condolence = empathy (neutral); elsewhere a partial negative (0.5)
+# - ANGRY on an opposition attack = supportive (0.7 positive, 0.3 negative)
+REACTION_WEIGHTS = {
+    (False, False): ((1, 1, 0, 0, 0, 0), (0, 0, 1, 1, 0, 0), (0, 0, 0, 0, 0.5, 1)),
+    (True, False): ((1, 1, 0, 0, 0, 0), (0, 0, 1, 1, 1, 0), (0, 0, 0, 0, 0, 1)),
+    (False, True): ((1, 1, 0, 0, 0, 0.7), (0, 0, 1, 1, 0, 0), (0, 0, 0, 0, 0, 0.3)),
+    (True, True): ((1, 1, 0, 0, 0, 0.7), (0, 0, 1, 1, 1, 0), (0, 0, 0, 0, 0, 0.3)),
+}
+
+
 def analyze_reactions_only(reactions_dict: dict, post_context: str = "") -> dict:
     """
     Fallback analysis based on reactions when LLM fails or no comments exist.
     Uses contextual rules for political posts.
     """
-    like = reactions_dict.get('like', 0) or 0
-    love = reactions_dict.get('love', 0) or 0
-    haha = reactions_dict.get('haha', 0) or 0
-    wow = reactions_dict.get('wow', 0) or 0
-    sad = reactions_dict.get('sad', 0) or 0
-    angry = reactions_dict.get('angry', 0) or 0
+    counts = [reactions_dict.get(kind, 0) or 0 for kind in REACTION_TYPES]
     
-    total = like + love + haha + wow + sad + angry
+    total = sum(counts)
     if total == 0:
         return {
             "positive_count": 0,
@@ -125,28 +346,19 @@ def analyze_reactions_only(reactions_dict: dict, post_context: str = "") -> dict
         }
     
     # Contextual interpretation
-    context_lower = (post_context or "").lower()
+    context = post_context or ""
     
     # Condolence/Death posts: SAD is supportive, not negative
-    is_condolence = any(word in context_lower for word in ['condolence', 'death', 'passed away', 'rip', 'నివాళి', 'శోకం', 'श्रद्धांजलि'])
+    is_condolence = CONDOLENCE_RE.search(context) is not None
     
     # Opposition criticism: ANGRY might be supportive
-    is_opposition_attack = any(word in context_lower for word in ['opposition', 'tdp', 'bjp', 'congress', 'criticism', 'విమర్శ', 'आलोचना', 'expose'])
-    
-    # Calculate sentiment
-    positive = like + love
-    negative = angry
-    neutral = haha + wow
+    is_opposition_attack = OPPOSITION_RE.search(context) is not None
     
-    # Contextual adjustments
-    if is_condolence:
-        neutral += sad  # SAD on condolence = empathy, not negative
-    else:
-        negative += sad * 0.5  # SAD elsewhere might be partial negative
-    
-    if is_opposition_attack:
-        positive += angry * 0.7  # ANGRY on opposition attack = supportive
-        negative = angry * 0.3
+    # Calculate sentiment with the weights for this context
+    positive, neutral, negative = (
+        sum(weight * count for weight, count in zip(row, counts))
+        for row in REACTION_WEIGHTS[is_condolence, is_opposition_attack]
+    )
     
     # Determine overall sentiment
     if positive > (negative + neutral):
@@ -168,6 +380,25 @@ def analyze_reactions_only(reactions_dict: dict, post_context: str = "") -> dict
     }
 
 
+# SLA percentage cut-offs and the label for each band (>= 30, >= 50, >= 75)
+STABILITY_CUTS = (30, 50, 75)
+STABILITY_LABELS = ("Critical", "Needs Improvement", "Good", "Excellent")
+
+# Resolution window per priority_level, used when a grievance has no deadline_timestamp
+SLA_HOURS = {"CRITICAL": 4, "HIGH": 24, "MEDIUM": 72, "LOW": 336}
+DEFAULT_SLA_HOURS = SLA_HOURS["LOW"]
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Column by name, or an all-missing one when no row carries that field"""
+    return df[name] if name in df else pd.Series(None, index=df.index, dtype=object)
+
+
+def _parse_timestamps(values: pd.Series) -> pd.Series:
+    """ISO-8601 strings (trailing Z allowed) to UTC; blanks and bad values become NaT"""
+    return pd.to_datetime(values, utc=True, errors='coerce', format='ISO8601')
+
+
 def calculate_ground_stability(grievances: list) -> dict:
     """
     Calculate SLA-based Ground Stability metrics from grievance data.
@@ -180,8 +411,6 @@ def calculate_ground_stability(grievances: list) -> dict:
     
     Returns stability percentage and status.
     """
-    from datetime import datetime, timezone
-    
     if not grievances:
         return {
             "total": 0,
@@ -193,71 +422,36 @@ def calculate_ground_stability(grievances: list) -> dict:
             "rating_count": 0
         }
     
-    total = len(grievances)
-    resolved = 0
-    resolved_within_sla = 0
-    rating_sum = 0
-    rating_count = 0
+    # One column per field, so every check below is a single vectorized pass
+    df = pd.DataFrame(grievances)
+    total = len(df)
     
-    sla_hours = {
-        "CRITICAL": 4,
-        "HIGH": 24,
-        "MEDIUM": 72,
-        "LOW": 336
-    }
+    resolved_mask = _column(df, 'status').fillna('').astype(str).str.upper() == 'RESOLVED'
+    resolved = int(resolved_mask.sum())
     
-    now = datetime.now(timezone.utc)
+    # Effective deadline: the stored deadline, else created_at + the priority's SLA window
+    sla_hours = _column(df, 'priority_level').fillna('LOW').astype(str).str.upper().map(SLA_HOURS).fillna(DEFAULT_SLA_HOURS)
+    fallback_deadline = _parse_timestamps(_column(df, 'created_at')) + pd.to_timedelta(sla_hours, unit='h')
+    effective_deadline = _parse_timestamps(_column(df, 'deadline_timestamp')).fillna(fallback_deadline)
     
-    for g in grievances:
-        status = (g.get('status') or '').upper()
-        
-        # Count resolved
-        if status == 'RESOLVED':
-            resolved += 1
-            
-            # Check if resolved within SLA
-            created_at = g.get('created_at')
-            deadline = g.get('deadline_timestamp')
-            priority = (g.get('priority_level') or 'LOW').upper()
-            
-            if deadline:
-                try:
-                    deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-                    # If resolved before deadline, it's within SLA
-                    resolved_within_sla += 1  # Simplified: assume resolved = within SLA
-                except:
-                    pass
-            elif created_at:
-                # Calculate based on SLA hours
-                try:
-                    created_dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    hours_allowed = sla_hours.get(priority, 336)
-                    # Simplified: if resolved, count as within SLA
-                    resolved_within_sla += 1
-                except:
-                    pass
-        
-        # Collect feedback ratings
-        rating = g.get('feedback_rating')
-        if rating:
-            rating_sum += rating
-            rating_count += 1
+    # Resolved on or before that deadline; a missing resolved_at is judged as of now
+    # (conservative). Rows with no usable deadline at all never count.
+    resolved_at = _parse_timestamps(_column(df, 'resolved_at')).fillna(pd.Timestamp.now(tz='UTC'))
+    resolved_within_sla = int((resolved_mask & (resolved_at <= effective_deadline)).sum())
+    
+    # Collect feedback ratings (unset / 0 means no rating)
+    ratings = pd.to_numeric(_column(df, 'feedback_rating'), errors='coerce')
+    ratings = ratings[ratings.notna() & (ratings != 0)]
+    rating_count = int(ratings.size)
     
     # Calculate SLA percentage
-    sla_percentage = (resolved_within_sla / total * 100) if total > 0 else 0
+    sla_percentage = resolved_within_sla / total * 100
     
     # Calculate average citizen rating
-    citizen_rating = (rating_sum / rating_count) if rating_count > 0 else 0
+    citizen_rating = float(ratings.mean()) if rating_count > 0 else 0
     
     # Determine status label
-    if sla_percentage >= 75:
-        status_label = "Excellent"
-    elif sla_percentage >= 50:
-        status_label = "Good"
-    elif sla_percentage >= 30:
-        status_label = "Needs Improvement"
-    else:
-        status_label = "Critical"
+    status_label = STABILITY_LABELS[bisect_right(STABILITY_CUTS, sla_percentage)]
     
     return {
         "total": total,
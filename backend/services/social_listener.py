@@ -1,7 +1,9 @@
 import random
-from textblob import TextBlob
+from itertools import cycle, islice
+import numpy as np
 from datetime import datetime, date
-from database import supabase
+from database import get_supabase_async
+from services.sentiment_engine import comment_polarity, POLARITY_THRESHOLD
 
 # Mock Comments to simulate "Listening" to the public
 # In Production, this would be replaced by requests.get(FACEBOOK_GRAPH_API)
@@ -18,6 +20,13 @@ MOCK_COMMENTS = [
     "Excellent initiative on the health camp!"
 ]
 
+# The mock feed never changes, so score it once at import (parallel to MOCK_COMMENTS)
+MOCK_POLARITY = tuple(comment_polarity(comment) for comment in MOCK_COMMENTS)
+
+# Comments "heard" per tick, drawn from one shuffle of the feed cycled forever
+COMMENTS_PER_TICK = 3
+MOCK_ORDER = cycle(random.sample(range(len(MOCK_COMMENTS)), len(MOCK_COMMENTS)))
+
 async def fetch_and_analyze_social_feed():
     """
     Cron Job Function: 
@@ -27,28 +36,18 @@ async def fetch_and_analyze_social_feed():
     """
     print("🔄 [Social Listener] Tuning into public sentiment...")
     
-    # 1. Simulate fetching 3 random comments
-    new_comments = random.sample(MOCK_COMMENTS, 3)
+    # 1. Simulate fetching the next few comments (by index, to reuse the precomputed scores)
+    picked = list(islice(MOCK_ORDER, COMMENTS_PER_TICK))
+    new_comments = [MOCK_COMMENTS[i] for i in picked]
     
-    # Count sentiments
-    positive_count = 0
-    negative_count = 0
-    neutral_count = 0
-    total_score = 0.0
+    # 2. Analyze (Local Python TextBlob lexicon, precomputed for the mock feed)
+    # Returns float: -1.0 (Bad) to 1.0 (Good)
+    scores = np.fromiter((MOCK_POLARITY[i] for i in picked), dtype=np.float64, count=len(picked))
+    total_score = float(scores.sum())
     
-    for comment in new_comments:
-        # 2. Analyze (Local Python TextBlob)
-        blob = TextBlob(comment)
-        score = blob.sentiment.polarity  # Returns float: -1.0 (Bad) to 1.0 (Good)
-        total_score += score
-        
-        # Categorize sentiment
-        if score > 0.1:
-            positive_count += 1
-        elif score < -0.1:
-            negative_count += 1
-        else:
-            neutral_count += 1
+    # Categorize sentiment: bucket 0 = negative, 1 = neutral, 2 = positive (thresholds exclusive)
+    buckets = 1 + (scores > POLARITY_THRESHOLD).astype(np.intp) - (scores < -POLARITY_THRESHOLD)
+    negative_count, neutral_count, positive_count = (int(n) for n in np.bincount(buckets, minlength=3))
     
     # Determine Platform (Random for simulation)
     platform = random.choice(["facebook", "twitter", "whatsapp"])
@@ -62,7 +61,9 @@ async def fetch_and_analyze_social_feed():
     
     # 3. Store in DB
     try:
-        response = supabase.table("sentiment_analytics").insert(data).execute()
+        # Async client: the insert never blocks the event loop serving webhooks
+        supabase = await get_supabase_async()
+        response = await supabase.table("sentiment_analytics").insert(data).execute()
         print(f"✅ [Social Listener] Processed {len(new_comments)} comments. Avg Sentiment: {avg_score:.2f} (👍{positive_count} 👎{negative_count} 😐{neutral_count})")
         print("⚠️  Note: Full data storage requires DB schema migration. Only platform stored.")
     except Exception as e:
@@ -123,6 +123,7 @@ CREATE INDEX IF NOT EXISTS idx_users_politician_id ON users(politician_id);
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_grievances_politician_id ON grievances(politician_id);
 CREATE INDEX IF NOT EXISTS idx_grievances_status ON grievances(status);
+CREATE INDEX IF NOT EXISTS idx_grievances_citizen_phone ON grievances(citizen_phone, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_posts_politician_id ON posts(politician_id);
 CREATE INDEX IF NOT EXISTS idx_posts_status ON posts(status);
 CREATE INDEX IF NOT EXISTS idx_sentiment_politician_id ON sentiment_analytics(politician_id);
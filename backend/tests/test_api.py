@@ -4,16 +4,41 @@ Tests: Auth, Dashboard, Grievances, Analytics
 """
 import pytest
 import requests
+from requests.adapters import HTTPAdapter
 import os
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
+
+@pytest.fixture(scope="session")
+def http():
+    """One pooled keep-alive session for the whole run instead of a new connection per call"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(http):
+    """Log in once for the whole run; None when the test user can't authenticate"""
+    response = http.post(f"{BASE_URL}/api/auth/login", json={
+        "email": "ramkumar@example.com",
+        "password": "test123"
+    })
+    if response.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
 class TestHealthAndRoot:
     """Basic health check tests"""
     
-    def test_api_root(self):
+    def test_api_root(self, http):
         """Test API root endpoint"""
-        response = requests.get(f"{BASE_URL}/api/")
+        response = http.get(f"{BASE_URL}/api/")
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
@@ -24,9 +49,9 @@ class TestHealthAndRoot:
 class TestAuthentication:
     """Authentication endpoint tests"""
     
-    def test_login_success_with_test_user(self):
+    def test_login_success_with_test_user(self, http):
         """Test login with ramkumar@example.com"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        response = http.post(f"{BASE_URL}/api/auth/login", json={
             "email": "ramkumar@example.com",
             "password": "test123"
         })
@@ -41,18 +66,18 @@ class TestAuthentication:
         print(f"✓ Login successful for: {data['user']['email']}")
         return data["access_token"]
     
-    def test_login_invalid_email(self):
+    def test_login_invalid_email(self, http):
         """Test login with non-existent email"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        response = http.post(f"{BASE_URL}/api/auth/login", json={
             "email": "nonexistent@example.com",
             "password": "wrongpassword"
         })
         assert response.status_code == 401
         print("✓ Invalid email correctly rejected with 401")
     
-    def test_login_missing_fields(self):
+    def test_login_missing_fields(self, http):
         """Test login with missing fields"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        response = http.post(f"{BASE_URL}/api/auth/login", json={
             "email": "test@example.com"
         })
         assert response.status_code == 422  # Validation error
@@ -63,21 +88,16 @@ class TestDashboard:
     """Dashboard analytics tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Get auth token before each test"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": "ramkumar@example.com",
-            "password": "test123"
-        })
-        if response.status_code == 200:
-            self.token = response.json()["access_token"]
-            self.headers = {"Authorization": f"Bearer {self.token}"}
-        else:
+    def setup(self, http, auth_headers):
+        """Reuse the session's auth token"""
+        self.http = http
+        if auth_headers is None:
             pytest.skip("Authentication failed - skipping dashboard tests")
+        self.headers = auth_headers
     
     def test_dashboard_stats(self):
         """Test dashboard stats endpoint"""
-        response = requests.get(f"{BASE_URL}/api/analytics/dashboard", headers=self.headers)
+        response = self.http.get(f"{BASE_URL}/api/analytics/dashboard", headers=self.headers)
         assert response.status_code == 200, f"Dashboard failed: {response.text}"
         
         data = response.json()
@@ -93,7 +113,7 @@ class TestDashboard:
     
     def test_dashboard_without_auth(self):
         """Test dashboard without authentication"""
-        response = requests.get(f"{BASE_URL}/api/analytics/dashboard")
+        response = self.http.get(f"{BASE_URL}/api/analytics/dashboard")
         assert response.status_code in [401, 403]
         print("✓ Dashboard correctly requires authentication")
 
@@ -102,21 +122,16 @@ class TestGrievances:
     """Grievance CRUD tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Get auth token before each test"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": "ramkumar@example.com",
-            "password": "test123"
-        })
-        if response.status_code == 200:
-            self.token = response.json()["access_token"]
-            self.headers = {"Authorization": f"Bearer {self.token}"}
-        else:
+    def setup(self, http, auth_headers):
+        """Reuse the session's auth token"""
+        self.http = http
+        if auth_headers is None:
             pytest.skip("Authentication failed - skipping grievance tests")
+        self.headers = auth_headers
     
     def test_get_grievances_list(self):
         """Test getting list of grievances"""
-        response = requests.get(f"{BASE_URL}/api/grievances/", headers=self.headers)
+        response = self.http.get(f"{BASE_URL}/api/grievances/", headers=self.headers)
         assert response.status_code == 200, f"Get grievances failed: {response.text}"
         
         data = response.json()
@@ -132,7 +147,7 @@ class TestGrievances:
     
     def test_get_grievance_metrics(self):
         """Test grievance metrics endpoint"""
-        response = requests.get(f"{BASE_URL}/api/grievances/metrics", headers=self.headers)
+        response = self.http.get(f"{BASE_URL}/api/grievances/metrics", headers=self.headers)
         assert response.status_code == 200, f"Metrics failed: {response.text}"
         
         data = response.json()
@@ -148,7 +163,7 @@ class TestGrievances:
     
     def test_get_grievance_stats_overview(self):
         """Test grievance stats overview endpoint"""
-        response = requests.get(f"{BASE_URL}/api/grievances/stats/overview", headers=self.headers)
+        response = self.http.get(f"{BASE_URL}/api/grievances/stats/overview", headers=self.headers)
         assert response.status_code == 200, f"Stats overview failed: {response.text}"
         
         data = response.json()
@@ -167,7 +182,7 @@ class TestGrievances:
             "ai_priority": 5
         }
         
-        response = requests.post(f"{BASE_URL}/api/grievances/", json=grievance_data, headers=self.headers)
+        response = self.http.post(f"{BASE_URL}/api/grievances/", json=grievance_data, headers=self.headers)
         assert response.status_code == 200, f"Create grievance failed: {response.text}"
         
         data = response.json()
@@ -181,7 +196,7 @@ class TestGrievances:
     
     def test_grievances_without_auth(self):
         """Test grievances endpoint without authentication"""
-        response = requests.get(f"{BASE_URL}/api/grievances/")
+        response = self.http.get(f"{BASE_URL}/api/grievances/")
         assert response.status_code in [401, 403]
         print("✓ Grievances correctly requires authentication")
 
@@ -190,21 +205,16 @@ class TestSentimentAnalytics:
     """Sentiment analytics tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Get auth token before each test"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": "ramkumar@example.com",
-            "password": "test123"
-        })
-        if response.status_code == 200:
-            self.token = response.json()["access_token"]
-            self.headers = {"Authorization": f"Bearer {self.token}"}
-        else:
+    def setup(self, http, auth_headers):
+        """Reuse the session's auth token"""
+        self.http = http
+        if auth_headers is None:
             pytest.skip("Authentication failed - skipping sentiment tests")
+        self.headers = auth_headers
     
     def test_get_sentiment_data(self):
         """Test getting sentiment data"""
-        response = requests.get(f"{BASE_URL}/api/analytics/sentiment", headers=self.headers)
+        response = self.http.get(f"{BASE_URL}/api/analytics/sentiment", headers=self.headers)
         assert response.status_code == 200, f"Sentiment data failed: {response.text}"
         
         data = response.json()
@@ -213,7 +223,7 @@ class TestSentimentAnalytics:
     
     def test_get_sentiment_overview(self):
         """Test sentiment overview endpoint"""
-        response = requests.get(f"{BASE_URL}/api/analytics/sentiment/overview", headers=self.headers)
+        response = self.http.get(f"{BASE_URL}/api/analytics/sentiment/overview", headers=self.headers)
         assert response.status_code == 200, f"Sentiment overview failed: {response.text}"
         
         data = response.json()
@@ -227,21 +237,16 @@ class TestAIEndpoints:
     """AI integration tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Get auth token before each test"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": "ramkumar@example.com",
-            "password": "test123"
-        })
-        if response.status_code == 200:
-            self.token = response.json()["access_token"]
-            self.headers = {"Authorization": f"Bearer {self.token}"}
-        else:
+    def setup(self, http, auth_headers):
+        """Reuse the session's auth token"""
+        self.http = http
+        if auth_headers is None:
             pytest.skip("Authentication failed - skipping AI tests")
+        self.headers = auth_headers
     
     def test_generate_constituency_summary(self):
         """Test AI constituency summary generation"""
-        response = requests.post(
+        response = self.http.post(
             f"{BASE_URL}/api/ai/generate-constituency-summary",
             json={},
             headers=self.headers,
@@ -256,7 +261,7 @@ class TestAIEndpoints:
     
     def test_analyze_grievance(self):
         """Test AI grievance analysis"""
-        response = requests.post(
+        response = self.http.post(
             f"{BASE_URL}/api/ai/analyze-grievance",
             json={
                 "text": "The road in our village is completely damaged and needs urgent repair",
@@ -275,10 +280,10 @@ class TestAIEndpoints:
 class TestAuthMe:
     """Test /auth/me endpoint"""
     
-    def test_auth_me_endpoint(self):
+    def test_auth_me_endpoint(self, http):
         """Test getting current user info"""
         # First login
-        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        login_response = http.post(f"{BASE_URL}/api/auth/login", json={
             "email": "ramkumar@example.com",
             "password": "test123"
         })
@@ -290,7 +295,7 @@ class TestAuthMe:
         headers = {"Authorization": f"Bearer {token}"}
         
         # Test /auth/me
-        response = requests.get(f"{BASE_URL}/api/auth/me", headers=headers)
+        response = http.get(f"{BASE_URL}/api/auth/me", headers=headers)
         
         # Note: Previous test showed this returns 520, documenting actual behavior
         if response.status_code == 200:
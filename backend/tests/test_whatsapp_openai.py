@@ -5,6 +5,7 @@ Tests: WhatsApp webhook with OpenAI Whisper voice transcription, GPT-4o image an
 import pytest
 import requests
 import os
+import uuid
 
 # Get the backend URL from frontend .env file
 def get_backend_url():
@@ -19,6 +20,13 @@ def get_backend_url():
 
 BASE_URL = get_backend_url()
 
+# One SID prefix per run: the webhook ignores MessageSids it has already accepted
+RUN_ID = uuid.uuid4().hex[:8]
+
+
+def message_sid(n: int) -> str:
+    return f"TEST_MSG_{RUN_ID}_{n:03d}"
+
 
 class TestWhatsAppStatus:
     """WhatsApp status endpoint tests"""
@@ -45,7 +53,7 @@ class TestWhatsAppWebhookWelcomeMessage:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'hi',
-            'MessageSid': 'TEST_MSG_001',
+            'MessageSid': message_sid(1),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -72,7 +80,7 @@ class TestWhatsAppWebhookWelcomeMessage:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'hello',
-            'MessageSid': 'TEST_MSG_002',
+            'MessageSid': message_sid(2),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -95,7 +103,7 @@ class TestWhatsAppWebhookWelcomeMessage:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'namaste',
-            'MessageSid': 'TEST_MSG_003',
+            'MessageSid': message_sid(3),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -122,7 +130,7 @@ class TestWhatsAppWebhookHelpCommand:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'help',
-            'MessageSid': 'TEST_MSG_004',
+            'MessageSid': message_sid(4),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -157,7 +165,7 @@ class TestWhatsAppWebhookAudioHandling:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': '',
-            'MessageSid': 'TEST_MSG_005',
+            'MessageSid': message_sid(5),
             'ProfileName': 'Test User',
             'NumMedia': '1',
             'MediaUrl0': 'https://api.twilio.com/test-audio.ogg',
@@ -188,7 +196,7 @@ class TestWhatsAppWebhookAudioHandling:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': '',
-            'MessageSid': 'TEST_MSG_006',
+            'MessageSid': message_sid(6),
             'ProfileName': 'Test User',
             'NumMedia': '1',
             'MediaUrl0': 'https://api.twilio.com/test-audio.mp3',
@@ -216,7 +224,7 @@ class TestWhatsAppWebhookStatusCommand:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'status',
-            'MessageSid': 'TEST_MSG_008',
+            'MessageSid': message_sid(8),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -244,7 +252,7 @@ class TestWhatsAppWebhookTextGrievance:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'TEST_WHATSAPP: The road in my village is completely damaged and needs urgent repair',
-            'MessageSid': 'TEST_MSG_009',
+            'MessageSid': message_sid(9),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -351,7 +359,7 @@ class TestWhatsAppWebhookImageHandling:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': '',
-            'MessageSid': 'TEST_MSG_010',
+            'MessageSid': message_sid(10),
             'ProfileName': 'Test User',
             'NumMedia': '1',
             'MediaUrl0': 'https://api.twilio.com/test-image.jpg',
@@ -5,6 +5,7 @@ Tests: WhatsApp webhook with Sarvam voice transcription, Gemini image OCR, welco
 import pytest
 import requests
 import os
+import uuid
 
 # Get the backend URL from frontend .env file
 def get_backend_url():
@@ -19,6 +20,13 @@ def get_backend_url():
 
 BASE_URL = get_backend_url()
 
+# One SID prefix per run: the webhook ignores MessageSids it has already accepted
+RUN_ID = uuid.uuid4().hex[:8]
+
+
+def message_sid(n: int) -> str:
+    return f"TEST_MSG_{RUN_ID}_{n:03d}"
+
 
 class TestWhatsAppWebhookWelcome:
     """Test WhatsApp webhook welcome message"""
@@ -32,7 +40,7 @@ class TestWhatsAppWebhookWelcome:
                 "To": "whatsapp:+14155238886",
                 "Body": "hi",
                 "ProfileName": "TestUser",
-                "MessageSid": "SM123456789",
+                "MessageSid": message_sid(0),
                 "NumMedia": "0"
             }
         )
@@ -49,7 +57,7 @@ class TestWhatsAppWebhookWelcome:
                 "To": "whatsapp:+14155238886",
                 "Body": "hello",
                 "ProfileName": "TestUser",
-                "MessageSid": "SM123456790",
+                "MessageSid": message_sid(1),
                 "NumMedia": "0"
             }
         )
@@ -69,7 +77,7 @@ class TestWhatsAppWebhookHelp:
                 "To": "whatsapp:+14155238886",
                 "Body": "help",
                 "ProfileName": "TestUser",
-                "MessageSid": "SM123456791",
+                "MessageSid": message_sid(2),
                 "NumMedia": "0"
             }
         )
@@ -101,7 +109,7 @@ class TestWhatsAppWebhookTextGrievance:
                 "To": "whatsapp:+14155238886",
                 "Body": "Water supply issue in my area for 3 days",
                 "ProfileName": "TestUser",
-                "MessageSid": "SM123456792",
+                "MessageSid": message_sid(3),
                 "NumMedia": "0"
             }
         )
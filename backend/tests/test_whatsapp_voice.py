@@ -5,8 +5,42 @@ Tests: WhatsApp webhook with voice transcription, welcome/help messages, status
 import pytest
 import requests
 import os
+import sys
+import uuid
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+BACKEND_DIR = str(Path(__file__).resolve().parents[1])
+
+# One SID prefix per run: the webhook ignores MessageSids it has already accepted
+RUN_ID = uuid.uuid4().hex[:8]
+
+
+def message_sid(n: int) -> str:
+    return f"TEST_MSG_{RUN_ID}_{n:03d}"
+
+
+def run_conversation(body: str, phone: str = '+919876543210', name: str = 'Test User') -> str:
+    """
+    Run the webhook's background reply in-process and return the text it would send.
+    The webhook itself only acknowledges Twilio; the reply goes out via the REST API.
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from routes import whatsapp_routes
+    
+    async def converse():
+        with patch.object(whatsapp_routes, 'send_whatsapp_text', new=AsyncMock()) as send:
+            try:
+                await whatsapp_routes.reply_to_citizen(phone=phone, message=body, name=name)
+            finally:
+                await whatsapp_routes.close_grievance_insert_worker()
+        send.assert_awaited_once()
+        return send.await_args.args[1]
+    
+    return asyncio.run(converse())
 
 
 class TestWhatsAppStatus:
@@ -34,7 +68,7 @@ class TestWhatsAppWebhookWelcomeMessage:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'hi',
-            'MessageSid': 'TEST_MSG_001',
+            'MessageSid': message_sid(1),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -61,7 +95,7 @@ class TestWhatsAppWebhookWelcomeMessage:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'hello',
-            'MessageSid': 'TEST_MSG_002',
+            'MessageSid': message_sid(2),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -84,7 +118,7 @@ class TestWhatsAppWebhookWelcomeMessage:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'namaste',
-            'MessageSid': 'TEST_MSG_003',
+            'MessageSid': message_sid(3),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -111,7 +145,7 @@ class TestWhatsAppWebhookHelpCommand:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'help',
-            'MessageSid': 'TEST_MSG_004',
+            'MessageSid': message_sid(4),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -146,7 +180,7 @@ class TestWhatsAppWebhookAudioHandling:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': '',
-            'MessageSid': 'TEST_MSG_005',
+            'MessageSid': message_sid(5),
             'ProfileName': 'Test User',
             'NumMedia': '1',
             'MediaUrl0': 'https://api.twilio.com/test-audio.ogg',
@@ -177,7 +211,7 @@ class TestWhatsAppWebhookAudioHandling:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': '',
-            'MessageSid': 'TEST_MSG_006',
+            'MessageSid': message_sid(6),
             'ProfileName': 'Test User',
             'NumMedia': '1',
             'MediaUrl0': 'https://api.twilio.com/test-audio.mp3',
@@ -201,7 +235,7 @@ class TestWhatsAppWebhookAudioHandling:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': '',
-            'MessageSid': 'TEST_MSG_007',
+            'MessageSid': message_sid(7),
             'ProfileName': 'Test User',
             'NumMedia': '1',
             'MediaUrl0': 'https://api.twilio.com/test-audio.mp3',
@@ -229,7 +263,7 @@ class TestWhatsAppWebhookStatusCommand:
             'From': 'whatsapp:+919876543210',
             'To': 'whatsapp:+14155238886',
             'Body': 'status',
-            'MessageSid': 'TEST_MSG_008',
+            'MessageSid': message_sid(8),
             'ProfileName': 'Test User',
             'NumMedia': '0'
         }
@@ -240,9 +274,10 @@ class TestWhatsAppWebhookStatusCommand:
         )
         assert response.status_code == 200, f"Webhook failed: {response.text}"
         
-        response_text = response.text
+        # The webhook acknowledges at once; the status reply is sent separately
+        response_text = run_conversation('status')
         # Should contain either grievances or "no grievances" message
-        assert 'grievance' in response_text.lower() or 'Grievance' in response_text, \
+        assert 'grievance' in response_text.lower(), \
             f"Status should mention grievances. Got: {response_text}"
         
         print(f"✓ Status command works correctly")
@@ -253,23 +288,11 @@ class TestWhatsAppWebhookTextGrievance:
     
     def test_text_grievance_creation(self):
         """Test that text message creates a grievance"""
-        form_data = {
-            'From': 'whatsapp:+919876543210',
-            'To': 'whatsapp:+14155238886',
-            'Body': 'TEST_WHATSAPP: The road in my village is completely damaged and needs urgent repair',
-            'MessageSid': 'TEST_MSG_009',
-            'ProfileName': 'Test User',
-            'NumMedia': '0'
-        }
-        
-        response = requests.post(
-            f"{BASE_URL}/api/whatsapp/webhook",
-            data=form_data,
-            timeout=60  # AI analysis may take time
+        # Runs the webhook's background reply directly (posting the webhook as well would
+        # register the grievance twice); AI analysis may take time
+        response_text = run_conversation(
+            'TEST_WHATSAPP: The road in my village is completely damaged and needs urgent repair'
         )
-        assert response.status_code == 200, f"Webhook failed: {response.text}"
-        
-        response_text = response.text
         
         # Should contain success indicators
         success_indicators = ['registered', 'success', 'reference', 'priority', 'category']